@@ -0,0 +1,24 @@
+"""Add document_id indexes on blocks and chunks.
+
+Revision ID: 0001_document_id_indexes
+Revises:
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+
+revision = "0001_document_id_indexes"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # IF NOT EXISTS: tables created by init_db (create_all) already have them
+    op.execute("CREATE INDEX IF NOT EXISTS ix_blocks_document_id ON blocks (document_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_chunks_doc_block ON chunks (document_id, block_id)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_chunks_doc_block")
+    op.execute("DROP INDEX IF EXISTS ix_blocks_document_id")
@@ -0,0 +1,22 @@
+"""Add documents.file_hash.
+
+Revision ID: 0002_document_file_hash
+Revises: 0001_document_id_indexes
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+
+revision = "0002_document_file_hash"
+down_revision = "0001_document_id_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # IF NOT EXISTS: tables created by init_db (create_all) already have it
+    op.execute("ALTER TABLE documents ADD COLUMN IF NOT EXISTS file_hash VARCHAR(64)")
+
+
+def downgrade():
+    op.execute("ALTER TABLE documents DROP COLUMN IF EXISTS file_hash")
@@ -0,0 +1,22 @@
+"""Add documents.last_cross_check_hash.
+
+Revision ID: 0003_last_cross_check_hash
+Revises: 0002_document_file_hash
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+
+revision = "0003_last_cross_check_hash"
+down_revision = "0002_document_file_hash"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # IF NOT EXISTS: tables created by init_db (create_all) already have it
+    op.execute("ALTER TABLE documents ADD COLUMN IF NOT EXISTS last_cross_check_hash VARCHAR(64)")
+
+
+def downgrade():
+    op.execute("ALTER TABLE documents DROP COLUMN IF EXISTS last_cross_check_hash")
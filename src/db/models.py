@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Enum, BigInteger, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Enum, BigInteger, Boolean, ForeignKey, Index
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.dialects.postgresql import UUID
 import enum
@@ -21,6 +21,10 @@ class Document(Base):
     file_path = Column(Text, nullable=False)
     page_count = Column(Integer, nullable=True)
     file_size_bytes = Column(BigInteger, nullable=True)
+    # hex SHA-256 of the stored file
+    file_hash = Column(String(64), nullable=True)
+    # fingerprint (file + text blocks) of the last passing cross-check
+    last_cross_check_hash = Column(String(64), nullable=True)
     source = Column(String, nullable=True)
     ingestion_status = Column(Enum(IngestionStatus), default=IngestionStatus.received)
     probe_summary = Column(JSON, nullable=True)
@@ -36,6 +40,7 @@ class Page(Base):
 
 class Block(Base):
     __tablename__ = "blocks"
+    __table_args__ = (Index("ix_blocks_document_id", "document_id"),)
     id = Column(Integer, primary_key=True)
     document_id = Column(UUID(as_uuid=True))
     page_number = Column(Integer)
@@ -46,6 +51,8 @@ class Block(Base):
 
 class Chunk(Base):
     __tablename__ = "chunks"
+    # leading document_id also serves document-only filters
+    __table_args__ = (Index("ix_chunks_doc_block", "document_id", "block_id"),)
     chunk_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     block_id = Column(Integer, ForeignKey("blocks.id"), nullable=False)
     document_id = Column(UUID(as_uuid=True), ForeignKey("documents.document_id"), nullable=False)
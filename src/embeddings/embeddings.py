@@ -57,10 +57,10 @@ def get_embedding_model(name: str = "sentence-transformers/all-MiniLM-L6-v2"):
             key = os.environ.get("OPENAI_API_KEY")
             if not key:
                 raise RuntimeError("OPENAI_API_KEY not set in environment")
-            openai.api_key = key
+            client = openai.OpenAI(api_key=key)
             # OpenAI API: chunk call
-            resp = openai.Embedding.create(model=model_name, input=texts)
-            vecs = [r["embedding"] for r in resp["data"]]
+            resp = client.embeddings.create(model=model_name, input=texts)
+            vecs = [r.embedding for r in resp.data]
             return np.array(vecs, dtype="float32")
 
         return _openai_embed
@@ -188,9 +188,20 @@ def query_document_index(document_id: str, query: str, top_k: int = 5, model_nam
     """Return list of (vector_index, score) for top_k matches for a query string.
     Score is cosine similarity in [0,1].
     """
+    return query_document_index_batch(document_id, [query], top_k=top_k, model_name=model_name)[0]
+
+
+def query_document_index_batch(document_id: str, queries: List[str], top_k: int = 5, model_name: str = "sentence-transformers/all-MiniLM-L6-v2") -> List[List[Tuple[int, float]]]:
+    """Like query_document_index for several queries at once.
+
+    Loads the index and model once, embeds all queries in one call and runs
+    a single FAISS search. Results are in the same order as queries.
+    """
+    if not queries:
+        return []
     index, _ = load_index_for_document(document_id)
     embed_fn = get_embedding_model(model_name)
-    qv = embed_fn([query])
+    qv = embed_fn(list(queries))
     qv = _normalize_vectors(qv)
     D, I = index.search(qv, top_k)
-    return list(zip(I[0].tolist(), D[0].tolist()))
+    return [list(zip(ids, scores)) for ids, scores in zip(I.tolist(), D.tolist())]
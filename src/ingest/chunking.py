@@ -4,6 +4,21 @@ import re
 from typing import List, Dict, Tuple
 import uuid
 
+import numpy as np
+
+from ..utils.tokenize import count_tokens, batch_token_counts
+
+# optional imports
+try:
+    from numba import njit
+    _has_numba = True
+except ImportError:
+    njit = None
+    _has_numba = False
+
+# below this many paragraphs the JIT call overhead outweighs the loop
+NUMBA_MIN_PARAGRAPHS = 64
+
 
 class ChunkResult:
     """Result of chunking a block."""
@@ -34,8 +49,33 @@ class ChunkResult:
 
 
 def estimate_tokens(text: str) -> int:
-    """Rough token count: split by whitespace."""
-    return len(text.split())
+    """Token count using the cl100k_base tiktoken encoding."""
+    return count_tokens(text)
+
+
+def _split_points(para_tokens: np.ndarray, max_tokens: int) -> np.ndarray:
+    """Return paragraph indices where a new chunk starts (first is always 0).
+
+    A chunk is closed when adding the next paragraph would exceed
+    max_tokens; a single oversized paragraph still forms its own chunk.
+    """
+    n = para_tokens.shape[0]
+    starts = np.empty(n, dtype=np.int64)
+    starts[0] = 0
+    k = 1
+    running = 0
+    for i in range(n):
+        t = para_tokens[i]
+        if i > 0 and running + t > max_tokens:
+            starts[k] = i
+            k += 1
+            running = t
+        else:
+            running += t
+    return starts[:k]
+
+
+_split_points_jit = njit(cache=True)(_split_points) if _has_numba else None
 
 
 def chunk_text_semantic(
@@ -74,52 +114,31 @@ def chunk_text_semantic(
         chunks.append(chunk)
         return chunks
 
-    current_chunk = []
-    current_tokens = 0
-    prev_chunk_text = None
-
-    for para in paragraphs:
-        para_tokens = estimate_tokens(para)
-
-        # if adding this para exceeds limit, finalize current chunk
-        if current_tokens + para_tokens > max_tokens and current_chunk:
-            chunk_text = "\n\n".join(current_chunk)
-            overlap = False
-            if prev_chunk_text and overlap_tokens > 0:
-                # add overlap context from previous chunk
-                overlap_context = " ".join(prev_chunk_text.split()[-overlap_tokens:])
-                chunk_text = overlap_context + "\n\n" + chunk_text
-                overlap = True
-
-            chunk = ChunkResult(
-                chunk_id=str(uuid.uuid4()),
-                block_id=block_id,
-                document_id=document_id,
-                page_number=page_number,
-                content_type="text",
-                chunk_text=chunk_text,
-                token_count=estimate_tokens(chunk_text),
-                overlap_with_prev=overlap,
-                confidence_score=confidence,
-                creation_method="semantic_paragraph",
-            )
-            chunks.append(chunk)
-            prev_chunk_text = chunk_text
-            current_chunk = [para]
-            current_tokens = para_tokens
-        else:
-            current_chunk.append(para)
-            current_tokens += para_tokens
+    # count all paragraphs in one batched encode, then group by running sum
+    para_token_counts = np.asarray(batch_token_counts(paragraphs), dtype=np.int32)
+    if _has_numba and len(paragraphs) > NUMBA_MIN_PARAGRAPHS:
+        starts = _split_points_jit(para_token_counts, max_tokens).tolist()
+    else:
+        starts = _split_points(para_token_counts, max_tokens).tolist()
+    ends = starts[1:] + [len(paragraphs)]
+    groups = [paragraphs[a:b] for a, b in zip(starts, ends)]
 
-    # finalize last chunk
-    if current_chunk:
-        chunk_text = "\n\n".join(current_chunk)
+    chunk_texts = []
+    overlaps = []
+    prev_chunk_text = None
+    for group in groups:
+        chunk_text = "\n\n".join(group)
         overlap = False
         if prev_chunk_text and overlap_tokens > 0:
+            # add overlap context from previous chunk
             overlap_context = " ".join(prev_chunk_text.split()[-overlap_tokens:])
             chunk_text = overlap_context + "\n\n" + chunk_text
             overlap = True
+        chunk_texts.append(chunk_text)
+        overlaps.append(overlap)
+        prev_chunk_text = chunk_text
 
+    for chunk_text, overlap, token_count in zip(chunk_texts, overlaps, batch_token_counts(chunk_texts)):
         chunk = ChunkResult(
             chunk_id=str(uuid.uuid4()),
             block_id=block_id,
@@ -127,7 +146,7 @@ def chunk_text_semantic(
             page_number=page_number,
             content_type="text",
             chunk_text=chunk_text,
-            token_count=estimate_tokens(chunk_text),
+            token_count=token_count,
             overlap_with_prev=overlap,
             confidence_score=confidence,
             creation_method="semantic_paragraph",
@@ -30,6 +30,7 @@ def ingest(pdf_path):
         file_path=str(dest),
         page_count=meta.get('page_count'),
         file_size_bytes=meta.get('file_size_bytes'),
+        file_hash=meta.get('file_hash'),
         ingestion_status=IngestionStatus.received,
     )
     session.add(doc)
@@ -1,9 +1,10 @@
 import pdfplumber
 from pathlib import Path
+from ..utils.io import file_sha256
 
 def extract_basic_metadata(pdf_path: str) -> dict:
     path = Path(pdf_path)
-    result = {"file_size_bytes": path.stat().st_size, "page_count": None}
+    result = {"file_size_bytes": path.stat().st_size, "file_hash": file_sha256(path), "page_count": None}
     try:
         with pdfplumber.open(pdf_path) as pdf:
             result["page_count"] = len(pdf.pages)
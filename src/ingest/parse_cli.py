@@ -1,5 +1,5 @@
 import click
-from .parsing import parse_document, classify_page_type
+from .parsing import parse_document
 from ..db import get_session
 from ..db.models import Document, Block, Page, IngestionStatus
 import uuid
@@ -30,7 +30,7 @@ def parse(target):
 
     # parse all pages
     try:
-        per_page_blocks = parse_document(pdf_path)
+        per_page_blocks, per_page_types = parse_document(pdf_path)
     except Exception as e:
         click.echo(f"Error parsing document: {e}")
         return
@@ -38,7 +38,7 @@ def parse(target):
     # insert blocks into DB
     total_blocks = 0
     for page_num, blocks in per_page_blocks.items():
-        page_type = classify_page_type(pdf_path, page_num)
+        page_type = per_page_types.get(page_num)
 
         for block_result in blocks:
             block = Block(
@@ -2,7 +2,7 @@
 
 import pdfplumber
 import re
-from typing import List, Dict
+from typing import Dict, Iterable, List, Tuple
 
 
 class ExtractionResult:
@@ -23,30 +23,21 @@ class ExtractionResult:
         self.page_number = page_number
 
 
-def extract_text_from_page(pdf_path: str, page_number: int) -> ExtractionResult:
-    """Extract text from a page using pdfplumber text extraction.
+def _text_length(text: str) -> int:
+    """Length of page text, or 0 if it is blank.
 
-    Confidence based on text length and validity.
+    Uses the raw length instead of len(text.strip()) to avoid copying the
+    whole page; the confidence and page-type buckets are coarse enough.
     """
-    with pdfplumber.open(pdf_path) as pdf:
-        if page_number < 0 or page_number >= len(pdf.pages):
-            raise IndexError("page_number out of range")
-        page = pdf.pages[page_number]
-        try:
-            text = page.extract_text() or ""
-        except Exception as e:
-            text = ""
-            confidence = 10
-            return ExtractionResult(
-                block_type="text",
-                content=f"[extraction error: {e}]",
-                extraction_method="pdfplumber_text_error",
-                confidence=confidence,
-                page_number=page_number,
-            )
+    if not text or text.isspace():
+        return 0
+    return len(text)
 
+
+def _text_result(text: str, page_number: int) -> ExtractionResult:
+    """Build a text ExtractionResult with a length-based confidence."""
     # confidence heuristic
-    text_len = len(text.strip())
+    text_len = _text_length(text)
     if text_len == 0:
         confidence = 20
     elif text_len < 100:
@@ -65,21 +56,19 @@ def extract_text_from_page(pdf_path: str, page_number: int) -> ExtractionResult:
     )
 
 
-def extract_tables_from_page(pdf_path: str, page_number: int) -> List[ExtractionResult]:
-    """Extract tables from a page using pdfplumber table detection.
+def _text_error_result(error: Exception, page_number: int) -> ExtractionResult:
+    return ExtractionResult(
+        block_type="text",
+        content=f"[extraction error: {error}]",
+        extraction_method="pdfplumber_text_error",
+        confidence=10,
+        page_number=page_number,
+    )
 
-    Returns a list of ExtractionResult objects, one per table.
-    """
-    results = []
-    with pdfplumber.open(pdf_path) as pdf:
-        if page_number < 0 or page_number >= len(pdf.pages):
-            raise IndexError("page_number out of range")
-        page = pdf.pages[page_number]
-        try:
-            tables = page.find_tables()
-        except Exception:
-            tables = []
 
+def _table_results(tables, page_number: int) -> List[ExtractionResult]:
+    """Convert pdfplumber tables into ExtractionResult objects, one per table."""
+    results = []
     if not tables:
         return results
 
@@ -115,34 +104,118 @@ def extract_tables_from_page(pdf_path: str, page_number: int) -> List[Extraction
     return results
 
 
-def parse_document(pdf_path: str) -> Dict[int, List[ExtractionResult]]:
-    """Parse all pages in a document.
+def _page_type(text_len: int, table_count: int, image_count: int) -> str:
+    """Classify a page from its precomputed content signals."""
+    if text_len == 0 and image_count > 0:
+        return "image_heavy"
+    if table_count >= 2:
+        return "table_heavy"
+    if text_len > 500 and table_count == 0 and image_count == 0:
+        return "text_heavy"
+    if text_len > 0 or table_count > 0 or image_count > 0:
+        return "mixed"
+    return "unknown"
+
+
+def extract_text_from_page(pdf_path: str, page_number: int) -> ExtractionResult:
+    """Extract text from a page using pdfplumber text extraction.
 
-    Returns dict: {page_number: [ExtractionResult, ...]}
+    Confidence based on text length and validity.
     """
     with pdfplumber.open(pdf_path) as pdf:
-        total_pages = len(pdf.pages)
+        if page_number < 0 or page_number >= len(pdf.pages):
+            raise IndexError("page_number out of range")
+        page = pdf.pages[page_number]
+        try:
+            text = page.extract_text() or ""
+        except Exception as e:
+            return _text_error_result(e, page_number)
+
+    return _text_result(text, page_number)
 
+
+def extract_text_from_pages(pdf_path: str, page_numbers: Iterable[int]) -> Dict[int, ExtractionResult]:
+    """Extract text from several pages, opening the PDF once.
+
+    Each distinct page is extracted a single time. Out-of-range pages are
+    left out of the result.
+    """
     results = {}
-    for page_num in range(total_pages):
-        page_blocks = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_number in sorted(set(page_numbers)):
+            if page_number < 0 or page_number >= len(pdf.pages):
+                continue
+            page = pdf.pages[page_number]
+            try:
+                text = page.extract_text() or ""
+            except Exception as e:
+                results[page_number] = _text_error_result(e, page_number)
+            else:
+                results[page_number] = _text_result(text, page_number)
+            page.flush_cache()
+    return results
+
+
+def extract_tables_from_page(pdf_path: str, page_number: int) -> List[ExtractionResult]:
+    """Extract tables from a page using pdfplumber table detection.
+
+    Returns a list of ExtractionResult objects, one per table.
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        if page_number < 0 or page_number >= len(pdf.pages):
+            raise IndexError("page_number out of range")
+        page = pdf.pages[page_number]
         try:
-            # always extract text
-            text_result = extract_text_from_page(pdf_path, page_num)
-            page_blocks.append(text_result)
+            tables = page.find_tables()
         except Exception:
-            pass
+            tables = []
+
+    return _table_results(tables, page_number)
+
+
+def parse_document(pdf_path: str) -> Tuple[Dict[int, List[ExtractionResult]], Dict[int, str]]:
+    """Parse all pages in a document.
+
+    Opens the PDF once and extracts text/tables a single time per page;
+    blocks and page classification are both derived from those results.
+
+    Returns (per_page_blocks, per_page_types):
+    ({page_number: [ExtractionResult, ...]}, {page_number: page_type})
+    """
+    results = {}
+    page_types = {}
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_num, page in enumerate(pdf.pages):
+            page_blocks = []
+
+            # always extract text
+            try:
+                text = page.extract_text() or ""
+            except Exception as e:
+                text = ""
+                page_blocks.append(_text_error_result(e, page_num))
+            else:
+                page_blocks.append(_text_result(text, page_num))
 
-        try:
             # extract tables if present
-            table_results = extract_tables_from_page(pdf_path, page_num)
-            page_blocks.extend(table_results)
-        except Exception:
-            pass
+            try:
+                tables = page.find_tables() or []
+            except Exception:
+                tables = []
+            page_blocks.extend(_table_results(tables, page_num))
 
-        results[page_num] = page_blocks
+            try:
+                image_count = len(page.images or [])
+            except Exception:
+                image_count = 0
 
-    return results
+            results[page_num] = page_blocks
+            page_types[page_num] = _page_type(_text_length(text), len(tables), image_count)
+            # pdf.pages keeps every Page; drop its parsed layout so memory
+            # does not grow with the document
+            page.flush_cache()
+
+    return results, page_types
 
 
 def classify_page_type(pdf_path: str, page_number: int) -> str:
@@ -156,7 +229,7 @@ def classify_page_type(pdf_path: str, page_number: int) -> str:
         page = pdf.pages[page_number]
         try:
             text = page.extract_text() or ""
-            text_len = len(text.strip())
+            text_len = _text_length(text)
         except Exception:
             text_len = 0
 
@@ -172,12 +245,4 @@ def classify_page_type(pdf_path: str, page_number: int) -> str:
         except Exception:
             image_count = 0
 
-    if text_len == 0 and image_count > 0:
-        return "image_heavy"
-    if table_count >= 2:
-        return "table_heavy"
-    if text_len > 500 and table_count == 0 and image_count == 0:
-        return "text_heavy"
-    if text_len > 0 or table_count > 0 or image_count > 0:
-        return "mixed"
-    return "unknown"
+    return _page_type(text_len, table_count, image_count)
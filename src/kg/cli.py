@@ -1,6 +1,7 @@
 """CLI for knowledge graph extraction and queries."""
 import click
 import json
+from contextlib import closing
 from src.kg.extraction import extract_kg_for_document, sync_kg_to_neo4j
 from src.kg.neo4j_driver import Neo4jDriver
 from src.db import get_session
@@ -31,13 +32,12 @@ def extract(document_id, threshold, model):
 def sync(document_id, neo4j_uri):
     """Sync SQL KG to Neo4j."""
     click.echo(f"Syncing KG to Neo4j for document {document_id}...")
-    driver = Neo4jDriver(uri=neo4j_uri)
-    if not driver.driver:
-        click.echo("Failed to connect to Neo4j")
-        return
-    result = sync_kg_to_neo4j(document_id, driver)
+    with closing(Neo4jDriver(uri=neo4j_uri)) as driver:
+        if not driver.driver:
+            click.echo("Failed to connect to Neo4j")
+            return
+        result = sync_kg_to_neo4j(document_id, driver)
     click.echo(json.dumps(result, indent=2, default=str))
-    driver.close()
 
 
 @kg_cli.command()
@@ -1,11 +1,30 @@
 """Entity and relationship extraction from chunks using LLM."""
 import json
+import re
 import uuid
 from typing import Dict
-import openai
+from openai import OpenAI
 from src.config import logger
 from src.db import get_session
 from src.db.models import Chunk, Entity, Relationship
+from src.utils.tokenize import count_tokens, truncate_to_tokens
+
+# token budget for the chunk text embedded in the extraction prompt
+PROMPT_CHUNK_TOKENS = 1500
+
+# chunks shorter than this rarely yield entities worth an LLM call
+MIN_EXTRACTION_TOKENS = 50
+_PROPER_PHRASE = re.compile(r"[A-Z][a-z]+\s+[A-Z][a-z]+")
+
+_client = None
+
+
+def _get_client() -> OpenAI:
+    """Return a shared OpenAI client (reads OPENAI_API_KEY on first use)."""
+    global _client
+    if _client is None:
+        _client = OpenAI()
+    return _client
 
 
 def extract_entities_and_relations(chunk_text: str, chunk_id: str, block_id: str, 
@@ -37,24 +56,20 @@ Output ONLY a JSON object with this structure (no markdown, no explanation):
 Relationship types: CEO_OF, FOUNDED, LOCATED_IN, REGULATES, REFERENCES, OWNS, WORKS_FOR, REQUIRES, IMPLEMENTS, VIOLATES, ASSOCIATED_WITH
 
 TEXT:
-{chunk_text[:2000]}
+{truncate_to_tokens(chunk_text, PROMPT_CHUNK_TOKENS)}
 """
     
     try:
-        response = openai.ChatCompletion.create(
+        # JSON mode guarantees a bare JSON object, no markdown fences to strip
+        response = _get_client().chat.completions.create(
             model=model,
             messages=[{"role": "user", "content": prompt}],
+            response_format={"type": "json_object"},
             temperature=0.2,
             max_tokens=1000
         )
         
-        content = response.choices[0].message.content.strip()
-        # Try to parse JSON; if embedded in markdown, extract it
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
-        
+        content = response.choices[0].message.content
         result = json.loads(content)
         return result
     except json.JSONDecodeError as e:
@@ -65,13 +80,35 @@ TEXT:
         return {"entities": [], "relationships": []}
 
 
+def _worth_llm(text: str, token_count: int = None) -> bool:
+    """Cheap check that a chunk can plausibly contain named entities.
+
+    Requires at least MIN_EXTRACTION_TOKENS tokens and one capitalized
+    multi-word phrase, which also rules out numeric-only table rows.
+    """
+    if not text:
+        return False
+    if token_count is None:
+        token_count = count_tokens(text)
+    if token_count < MIN_EXTRACTION_TOKENS:
+        return False
+    return _PROPER_PHRASE.search(text) is not None
+
+
+def _entity_key(text: str) -> str:
+    """Normalize entity text for per-document deduplication."""
+    return text.strip().lower()
+
+
 def extract_kg_for_document(document_id: str, confidence_threshold: int = 85,
                             model: str = "gpt-3.5-turbo") -> Dict:
     """
     Extract all entities and relationships from a document's chunks.
     Store in SQL (entities, relationships tables).
     
-    Returns summary: {document_id, entities_created, relationships_created}
+    Chunks that fail the _worth_llm heuristic are not sent to the LLM.
+    
+    Returns summary: {document_id, entities_created, relationships_created, chunks_skipped}
     """
     with get_session() as session:
         # Fetch high-confidence chunks
@@ -82,10 +119,17 @@ def extract_kg_for_document(document_id: str, confidence_threshold: int = 85,
         
         entities_created = 0
         relationships_created = 0
-        entity_map = {}  # text -> entity_id for linking relationships
+        chunks_skipped = 0
+        entity_map = {}  # normalized text -> entity_id, scoped to this document
+        entity_chunks = {}  # normalized text -> chunk ids mentioning it
+        entities_by_key = {}  # normalized text -> pending Entity
         
         # Extract entities and relationships from each chunk
         for chunk in chunks:
+            if not _worth_llm(chunk.chunk_text, chunk.token_count):
+                chunks_skipped += 1
+                continue
+            
             result = extract_entities_and_relations(
                 chunk.chunk_text,
                 str(chunk.chunk_id),
@@ -97,7 +141,15 @@ def extract_kg_for_document(document_id: str, confidence_threshold: int = 85,
             
             # Create entity records
             for ent in result.get("entities", []):
+                key = _entity_key(ent["text"])
+                if key in entity_map:
+                    # already stored for this document; just record provenance
+                    if str(chunk.chunk_id) not in entity_chunks[key]:
+                        entity_chunks[key].append(str(chunk.chunk_id))
+                    continue
+                
                 entity_id = str(uuid.uuid4())
+                entity_chunks[key] = [str(chunk.chunk_id)]
                 entity = Entity(
                     entity_id=entity_id,
                     document_id=document_id,
@@ -111,16 +163,17 @@ def extract_kg_for_document(document_id: str, confidence_threshold: int = 85,
                     metadata_json={"chunk_text_snippet": chunk.chunk_text[:200]}
                 )
                 session.add(entity)
-                entity_map[ent["text"]] = entity_id
+                entity_map[key] = entity_id
+                entities_by_key[key] = entity
                 entities_created += 1
             
             # Create relationship records
             for rel in result.get("relationships", []):
-                source_text = rel["source"]
-                target_text = rel["target"]
+                source_key = _entity_key(rel["source"])
+                target_key = _entity_key(rel["target"])
                 
-                # Skip if entities weren't extracted in this batch
-                if source_text not in entity_map or target_text not in entity_map:
+                # Skip if entities weren't extracted for this document
+                if source_key not in entity_map or target_key not in entity_map:
                     continue
                 
                 relationship = Relationship(
@@ -129,8 +182,8 @@ def extract_kg_for_document(document_id: str, confidence_threshold: int = 85,
                     chunk_id=chunk.chunk_id,
                     block_id=chunk.block_id,
                     page_number=chunk.page_number,
-                    source_entity_id=entity_map[source_text],
-                    target_entity_id=entity_map[target_text],
+                    source_entity_id=entity_map[source_key],
+                    target_entity_id=entity_map[target_key],
                     relationship_type=rel.get("type", "ASSOCIATED_WITH"),
                     relationship_text=rel.get("text", ""),
                     confidence_score=80,
@@ -140,12 +193,17 @@ def extract_kg_for_document(document_id: str, confidence_threshold: int = 85,
                 session.add(relationship)
                 relationships_created += 1
         
+        # chunk lists are complete only now; assign a new dict so the JSON column sees the change
+        for key, entity in entities_by_key.items():
+            entity.metadata_json = {**entity.metadata_json, "chunk_ids": entity_chunks[key]}
+        
         session.commit()
     
     return {
         "document_id": str(document_id),
         "entities_created": entities_created,
-        "relationships_created": relationships_created
+        "relationships_created": relationships_created,
+        "chunks_skipped": chunks_skipped
     }
 
 
@@ -155,37 +213,38 @@ def sync_kg_to_neo4j(document_id: str, neo4j_driver) -> Dict:
         entities = session.query(Entity).filter(Entity.document_id == document_id).all()
         relationships = session.query(Relationship).filter(Relationship.document_id == document_id).all()
         
-        entities_synced = 0
-        for ent in entities:
-            success = neo4j_driver.create_entity_node(
-                str(ent.entity_id),
-                ent.entity_text,
-                ent.entity_type,
-                str(ent.document_id),
-                str(ent.chunk_id),
-                ent.page_number,
-                ent.confidence_score / 100.0,
-                metadata=ent.metadata_json
-            )
-            if success:
-                entities_synced += 1
-        
-        rels_synced = 0
-        for rel in relationships:
-            success = neo4j_driver.create_relationship(
-                str(rel.relationship_id),
-                str(rel.source_entity_id),
-                str(rel.target_entity_id),
-                rel.relationship_type,
-                rel.relationship_text,
-                rel.confidence_score / 100.0,
-                str(rel.document_id),
-                str(rel.chunk_id),
-                rel.page_number,
-                metadata=rel.metadata_json
-            )
-            if success:
-                rels_synced += 1
+        entity_rows = [
+            {
+                "entity_id": str(ent.entity_id),
+                "text": ent.entity_text,
+                "type": ent.entity_type,
+                "doc_id": str(ent.document_id),
+                "chunk_id": str(ent.chunk_id),
+                "page": ent.page_number,
+                "confidence": ent.confidence_score / 100.0,
+                "metadata": ent.metadata_json or {},
+            }
+            for ent in entities
+        ]
+        rel_rows = [
+            {
+                "rel_id": str(rel.relationship_id),
+                "source_id": str(rel.source_entity_id),
+                "target_id": str(rel.target_entity_id),
+                "rel_type": rel.relationship_type,
+                "rel_text": rel.relationship_text,
+                "confidence": rel.confidence_score / 100.0,
+                "doc_id": str(rel.document_id),
+                "chunk_id": str(rel.chunk_id),
+                "page": rel.page_number,
+                "metadata": rel.metadata_json or {},
+            }
+            for rel in relationships
+        ]
+    
+    # one round trip per type instead of one per row
+    entities_synced = neo4j_driver.create_entities_bulk(entity_rows)
+    rels_synced = neo4j_driver.create_relationships_bulk(rel_rows)
     
     return {
         "document_id": str(document_id),
@@ -1,8 +1,103 @@
 """Neo4j connection and utilities for knowledge graph storage and queries."""
+import atexit
+import hashlib
+import json
 import os
+from functools import lru_cache
 from typing import List, Dict, Optional
 from neo4j import GraphDatabase
-from src.config import logger
+from neo4j.exceptions import ClientError
+from src.config import logger, NEO4J_DRIVER_OPTIONS
+
+# rows per UNWIND transaction for bulk writes
+BULK_BATCH_SIZE = 10_000
+
+# one pooled driver per (uri, user, password hash) for the whole process,
+# with the number of open Neo4jDriver instances using it
+_drivers: Dict[tuple, list] = {}
+
+
+def _json_metadata(rows: List[Dict]) -> List[Dict]:
+    """Copy rows with metadata as a JSON string.
+
+    Neo4j properties must be primitives or arrays of them, so a map value
+    would fail the whole UNWIND batch.
+    """
+    return [
+        {**row, "metadata": row["metadata"] if isinstance(row.get("metadata"), str)
+         else json.dumps(row.get("metadata") or {})}
+        for row in rows
+    ]
+
+
+def _run_batch(tx, query: str, batch: List[Dict]):
+    tx.run(query, batch=batch).consume()
+
+
+# Endpoint ids are read on the server: the driver only fills in a
+# relationship's start/end node properties when those nodes are also
+# returned, and the start entity is not.
+_REL_PROJECTION = (
+    "[r IN rels | {props: properties(r), "
+    "source: startNode(r).entity_id, target: endNode(r).entity_id}]"
+)
+
+
+@lru_cache(maxsize=None)
+def _neighbor_query(depth: int) -> str:
+    """Variable-length neighbor query for servers without APOC.
+
+    Path bounds cannot be parameters, so one fixed query string is kept per
+    depth; reusing the same string lets Neo4j hit its plan cache.
+    """
+    return f"""
+    MATCH (e:Entity {{entity_id: $entity_id}})-[rs*1..{int(depth)}]-(neighbor)
+    UNWIND rs AS r
+    WITH collect(DISTINCT neighbor) AS nodes, collect(DISTINCT r) AS rels
+    RETURN nodes, {_REL_PROJECTION} AS relationships
+    """
+
+
+def _driver_key(uri: str, username: str, password: str) -> tuple:
+    # hashed so the cache never holds the password itself
+    return (uri, username, hashlib.sha256(password.encode()).hexdigest())
+
+
+def _get_driver(key: tuple, uri: str, username: str, password: str):
+    """Return the shared driver for key, creating it on first use.
+
+    Each call takes a reference; release it with _release_driver.
+    """
+    entry = _drivers.get(key)
+    if entry is None:
+        driver = GraphDatabase.driver(uri, auth=(username, password), **NEO4J_DRIVER_OPTIONS)
+        try:
+            driver.verify_connectivity()
+        except Exception:
+            driver.close()
+            raise
+        entry = _drivers[key] = [driver, 0]
+    entry[1] += 1
+    return entry[0]
+
+
+def _release_driver(key: tuple):
+    """Drop one reference; the driver is closed when no instance uses it."""
+    entry = _drivers.get(key)
+    if entry is None:
+        return
+    entry[1] -= 1
+    if entry[1] <= 0:
+        del _drivers[key]
+        entry[0].close()
+
+
+@atexit.register
+def close_all():
+    """Close every pooled driver, e.g. at interpreter exit."""
+    while _drivers:
+        _, (driver, _) = _drivers.popitem()
+        driver.close()
 
 
 class Neo4jDriver:
@@ -16,85 +111,141 @@ class Neo4jDriver:
         self.uri = uri or os.environ.get("NEO4J_URI", "bolt://localhost:7687")
         self.username = username or os.environ.get("NEO4J_USER", "neo4j")
         self.password = password or os.environ.get("NEO4J_PASSWORD", "password")
+        self._has_apoc = True
+        self._driver_key = _driver_key(self.uri, self.username, self.password)
         
         try:
-            self.driver = GraphDatabase.driver(self.uri, auth=(self.username, self.password))
-            self.driver.verify_connectivity()
+            self.driver = _get_driver(self._driver_key, self.uri, self.username, self.password)
             logger.info(f"Connected to Neo4j at {self.uri}")
         except Exception as e:
             logger.error(f"Failed to connect to Neo4j: {e}")
             self.driver = None
+        
+        if self.driver:
+            self.ensure_schema()
+    
+    def ensure_schema(self):
+        """Create the constraint and indexes MERGE relies on (idempotent).
+
+        Without them every MERGE on entity_id / rel_id is a label scan.
+        """
+        queries = [
+            "CREATE CONSTRAINT entity_id_unique IF NOT EXISTS FOR (e:Entity) REQUIRE e.entity_id IS UNIQUE",
+            "CREATE INDEX entity_type IF NOT EXISTS FOR (e:Entity) ON (e.type)",
+            "CREATE INDEX rel_id IF NOT EXISTS FOR ()-[r:REL]-() ON (r.rel_id)",
+        ]
+        with self.driver.session() as session:
+            for q in queries:
+                try:
+                    session.run(q).consume()
+                except Exception as e:
+                    logger.warning(f"Schema operation failed: {e}")
     
     def close(self):
+        """Release this instance's use of the shared driver.
+
+        The driver itself stays open while other instances still use it.
+        """
         if self.driver:
-            self.driver.close()
+            self.driver = None
+            _release_driver(self._driver_key)
     
     def create_entity_node(self, entity_id: str, entity_text: str, entity_type: str, 
                           document_id: str, chunk_id: str, page_number: int,
                           confidence: float, metadata: Dict = None) -> bool:
         """Create an entity node in Neo4j."""
-        if not self.driver:
-            return False
-        
-        query = """
-        MERGE (e:Entity {entity_id: $entity_id})
-        SET e.text = $text, e.type = $type, e.confidence = $confidence,
-            e.document_id = $doc_id, e.chunk_id = $chunk_id, e.page = $page,
-            e.metadata = $metadata
-        RETURN e
-        """
-        try:
-            with self.driver.session() as session:
-                session.run(query, {
-                    "entity_id": entity_id,
-                    "text": entity_text,
-                    "type": entity_type,
-                    "doc_id": document_id,
-                    "chunk_id": chunk_id,
-                    "page": page_number,
-                    "confidence": confidence,
-                    "metadata": metadata or {}
-                })
-            return True
-        except Exception as e:
-            logger.error(f"Error creating entity node: {e}")
-            return False
+        row = {
+            "entity_id": entity_id,
+            "text": entity_text,
+            "type": entity_type,
+            "doc_id": document_id,
+            "chunk_id": chunk_id,
+            "page": page_number,
+            "confidence": confidence,
+            "metadata": metadata or {}
+        }
+        return self.create_entities_bulk([row]) == 1
     
     def create_relationship(self, rel_id: str, source_entity_id: str, target_entity_id: str,
                            rel_type: str, rel_text: str, confidence: float,
                            document_id: str, chunk_id: str, page_number: int,
                            metadata: Dict = None) -> bool:
         """Create a relationship between two entities."""
-        if not self.driver:
-            return False
+        row = {
+            "rel_id": rel_id,
+            "source_id": source_entity_id,
+            "target_id": target_entity_id,
+            "rel_type": rel_type,
+            "rel_text": rel_text,
+            "confidence": confidence,
+            "doc_id": document_id,
+            "chunk_id": chunk_id,
+            "page": page_number,
+            "metadata": metadata or {}
+        }
+        return self.create_relationships_bulk([row]) == 1
+    
+    def create_entities_bulk(self, rows: List[Dict]) -> int:
+        """Create or update many entity nodes with UNWIND batches.
+
+        Each row needs: entity_id, text, type, doc_id, chunk_id, page,
+        confidence, metadata (a dict, stored as JSON). Returns the number of
+        rows written.
+        """
+        if not self.driver or not rows:
+            return 0
         
         query = """
-        MATCH (source:Entity {entity_id: $source_id})
-        MATCH (target:Entity {entity_id: $target_id})
-        MERGE (source)-[r:REL {rel_id: $rel_id}]->(target)
-        SET r.type = $rel_type, r.text = $rel_text, r.confidence = $confidence,
-            r.document_id = $doc_id, r.chunk_id = $chunk_id, r.page = $page,
-            r.metadata = $metadata
-        RETURN r
+        UNWIND $batch AS row
+        MERGE (e:Entity {entity_id: row.entity_id})
+        SET e.text = row.text, e.type = row.type, e.confidence = row.confidence,
+            e.document_id = row.doc_id, e.chunk_id = row.chunk_id, e.page = row.page,
+            e.metadata = row.metadata
         """
         try:
-            with self.driver.session() as session:
-                session.run(query, {
-                    "rel_id": rel_id,
-                    "source_id": source_entity_id,
-                    "target_id": target_entity_id,
-                    "rel_type": rel_type,
-                    "rel_text": rel_text,
-                    "confidence": confidence,
-                    "doc_id": document_id,
-                    "chunk_id": chunk_id,
-                    "page": page_number,
-                    "metadata": metadata or {}
-                })
-            return True
+            self._write_batches(query, _json_metadata(rows))
+            return len(rows)
         except Exception as e:
-            logger.error(f"Error creating relationship: {e}")
-            return False
+            logger.error(f"Error creating entity nodes in bulk: {e}")
+            return 0
+    
+    def create_relationships_bulk(self, rows: List[Dict]) -> int:
+        """Create or update many relationships with UNWIND batches.
+
+        Each row needs: rel_id, source_id, target_id, rel_type, rel_text,
+        confidence, doc_id, chunk_id, page, metadata (a dict, stored as
+        JSON). Returns the number of rows written.
+        """
+        if not self.driver or not rows:
+            return 0
+        
+        # the edge label is always REL (type lives in a property), so one
+        # static query covers every relationship type
+        query = """
+        UNWIND $batch AS row
+        MATCH (source:Entity {entity_id: row.source_id})
+        MATCH (target:Entity {entity_id: row.target_id})
+        MERGE (source)-[r:REL {rel_id: row.rel_id}]->(target)
+        SET r.type = row.rel_type, r.text = row.rel_text, r.confidence = row.confidence,
+            r.document_id = row.doc_id, r.chunk_id = row.chunk_id, r.page = row.page,
+            r.metadata = row.metadata
+        """
+        try:
+            self._write_batches(query, _json_metadata(rows))
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Error creating relationships in bulk: {e}")
+            return 0
+    
+    def _write_batches(self, query: str, rows: List[Dict]):
+        """Run an UNWIND $batch write query over rows in BULK_BATCH_SIZE slices.
+
+        One session is reused; each slice commits in its own managed write
+        transaction.
+        """
+        with self.driver.session() as session:
+            for i in range(0, len(rows), BULK_BATCH_SIZE):
+                session.execute_write(_run_batch, query, rows[i:i + BULK_BATCH_SIZE])
     
     def query_entities_by_type(self, entity_type: str, limit: int = 10) -> List[Dict]:
         """Query entities by type."""
@@ -111,26 +262,50 @@ class Neo4jDriver:
             return []
     
     def query_neighbors(self, entity_id: str, depth: int = 1) -> Dict:
-        """Query entities connected to a given entity (graph traversal)."""
+        """Query entities connected to a given entity (graph traversal).
+
+        Uses APOC's subgraphAll, which visits each node and relationship
+        once instead of returning one row per path. Falls back to a cached
+        per-depth variable-length query when APOC is not installed.
+
+        Returns: {"entity": id, "neighbors": [node, ...],
+                  "relationships": [{..., "source": id, "target": id}, ...]}
+        """
         if not self.driver:
             return {}
         
-        query = f"""
+        depth = int(depth)
+        apoc_query = f"""
         MATCH (e:Entity {{entity_id: $entity_id}})
-        MATCH (e)-[r*1..{depth}]-(neighbor)
-        RETURN e, r, neighbor
+        CALL apoc.path.subgraphAll(e, {{maxLevel: $depth}})
+        YIELD nodes, relationships AS rels
+        RETURN nodes, {_REL_PROJECTION} AS relationships
         """
+        params = {"entity_id": entity_id, "depth": depth}
         try:
             with self.driver.session() as session:
-                result = session.run(query, {"entity_id": entity_id})
-                neighbors = []
-                for record in result:
-                    neighbors.append({
-                        "source": dict(record["e"]),
-                        "relationships": [dict(rel) for rel in record["r"]] if record["r"] else [],
-                        "target": dict(record["neighbor"])
-                    })
-                return {"entity": entity_id, "neighbors": neighbors}
+                record = None
+                if self._has_apoc:
+                    try:
+                        record = session.run(apoc_query, params).single()
+                    except ClientError as e:
+                        if e.code != "Neo.ClientError.Procedure.ProcedureNotFound":
+                            raise
+                        logger.warning("APOC not installed; using variable-length neighbor query")
+                        self._has_apoc = False
+                if not self._has_apoc:
+                    record = session.run(_neighbor_query(depth), params).single()
+            if record is None:
+                return {"entity": entity_id, "neighbors": [], "relationships": []}
+            neighbors = [
+                dict(node) for node in record["nodes"]
+                if node.get("entity_id") != entity_id
+            ]
+            relationships = [
+                {**rel["props"], "source": rel["source"], "target": rel["target"]}
+                for rel in record["relationships"]
+            ]
+            return {"entity": entity_id, "neighbors": neighbors, "relationships": relationships}
         except Exception as e:
             logger.error(f"Error querying neighbors: {e}")
             return {}
@@ -1,12 +1,19 @@
 import os
+import random
+import re
+import asyncio
 import logging
 import time
 import uuid
-from typing import List, Dict, Any
+from functools import lru_cache
+from itertools import islice
+from typing import Iterable, Iterator, List, Dict, Any, Set
 from sqlalchemy import select
-from neo4j import GraphDatabase
+from neo4j import AsyncGraphDatabase
+from neo4j.exceptions import TransientError
 from dotenv import load_dotenv
 
+from src.config import NEO4J_DRIVER_OPTIONS
 from src.db.session import get_session
 from src.db.models import Entity, Relationship
 
@@ -16,6 +23,83 @@ load_dotenv(dotenv_path="cfg/.env")
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# one character at a time (not runs) so existing type names are unchanged
+_NON_ALNUM = re.compile(r"[^A-Za-z0-9]")
+
+# the only Entity and Relationship fields the sync reads
+_ENTITY_COLUMNS = (
+    Entity.__table__.c.entity_id,
+    Entity.__table__.c.entity_text,
+    Entity.__table__.c.entity_type,
+    Entity.__table__.c.confidence_score,
+)
+_RELATIONSHIP_COLUMNS = (
+    Relationship.__table__.c.source_entity_id,
+    Relationship.__table__.c.target_entity_id,
+    Relationship.__table__.c.relationship_type,
+    Relationship.__table__.c.confidence_score,
+)
+
+# rows streamed from Postgres and sent to Neo4j per query
+SYNC_BATCH_SIZE = 10_000
+# rows committed per server-side transaction inside CALL { ... } IN TRANSACTIONS
+NEO4J_TX_ROWS = 10_000
+# rows deleted per server-side transaction when pruning
+PRUNE_TX_ROWS = 5_000
+# retries for a concurrent write hitting a deadlock or lock timeout
+WRITE_RETRIES = 5
+RETRY_BASE_DELAY = 0.5
+
+
+async def _run_batch(session, query: str, rows: List[Dict[str, Any]], **params):
+    """Run an UNWIND $batch query as an auto-commit query.
+
+    CALL { ... } IN TRANSACTIONS is only allowed outside managed
+    transactions, so this uses session.run rather than execute_write.
+    """
+    result = await session.run(query, batch=rows, **params)
+    await result.consume()
+
+
+def _stream_rows(pg_session, *columns) -> Iterator:
+    """Yield Core rows of the given columns, SYNC_BATCH_SIZE at a time.
+
+    Skips ORM instantiation; ids come back as the driver's UUID objects and
+    are only ever used as dict/set keys, never stringified.
+    """
+    stmt = select(*columns).execution_options(yield_per=SYNC_BATCH_SIZE)
+    yield from pg_session.execute(stmt)
+
+
+async def _run_batch_with_retry(driver, query: str, rows: List[Dict[str, Any]], **params):
+    """_run_batch in a fresh session, retrying transient failures with backoff.
+
+    Concurrent relationship types MERGE the same endpoint nodes and can
+    deadlock or time out on their locks. Auto-commit queries get no driver
+    retries (max_transaction_retry_time only covers managed transactions),
+    and the MERGE/SET batch is idempotent, so it is simply run again.
+    """
+    for attempt in range(WRITE_RETRIES + 1):
+        try:
+            async with driver.session() as session:
+                await _run_batch(session, query, rows, **params)
+            return
+        except TransientError as e:
+            if attempt == WRITE_RETRIES:
+                raise
+            delay = RETRY_BASE_DELAY * 2 ** attempt * random.uniform(0.5, 1.5)
+            logger.warning(f"Transient Neo4j error, retrying in {delay:.1f}s: {e}")
+            await asyncio.sleep(delay)
+
+
+def _batched(iterable: Iterable, n: int) -> Iterator[List]:
+    it = iter(iterable)
+    while True:
+        batch = list(islice(it, n))
+        if not batch:
+            return
+        yield batch
+
 class Neo4jSyncAgent:
     def __init__(self):
         self.uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
@@ -23,48 +107,57 @@ class Neo4jSyncAgent:
         self.password = os.getenv("NEO4J_PASSWORD", "password")
         self.driver = None
         
-    def connect(self):
+    async def connect(self):
         try:
-            self.driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password))
-            self.driver.verify_connectivity()
+            self.driver = AsyncGraphDatabase.driver(
+                self.uri, auth=(self.user, self.password), **NEO4J_DRIVER_OPTIONS
+            )
+            await self.driver.verify_connectivity()
             logger.info("Connected to Neo4j.")
         except Exception as e:
             logger.error(f"Failed to connect to Neo4j: {e}")
             raise
 
-    def close(self):
+    async def close(self):
         if self.driver:
-            self.driver.close()
+            await self.driver.close()
             logger.info("Neo4j connection closed.")
 
-    def sync(self):
+    async def sync(self):
         """Main execution method."""
         start_time = time.time()
-        self.connect()
+        await self.connect()
         pg_session = get_session()
         
         # Generate a unique ID for this sync run to track active nodes
         sync_run_id = str(uuid.uuid4())
         
         try:
-            # 1. Fetch Data from Postgres
-            logger.info("Fetching data from PostgreSQL...")
-            entities = pg_session.execute(select(Entity)).scalars().all()
-            relationships = pg_session.execute(select(Relationship)).scalars().all()
-            
-            logger.info(f"Postgres State: {len(entities)} Entities, {len(relationships)} Relationships.")
+            # 1. Rows are streamed from Postgres, never fully materialized
+            logger.info("Streaming data from PostgreSQL...")
 
-            # 1.5 Create Indexes
-            self._create_indexes()
+            async with self.driver.session() as session:
+                # 1.5 Create Indexes
+                await self._create_indexes(session)
 
-            # 2. Sync Nodes
-            self._sync_nodes(entities, sync_run_id)
-            
-            # 3. Sync Relationships
-            self._sync_relationships(relationships, entities, sync_run_id)
-            
-            # 4. Cleanup (Deletions)
-            self._prune_orphans(sync_run_id)
+                # Build lookup for Entity ID -> (Name, Type, Confidence) in the
+                # one pass over entities this sync makes
+                entity_lookup = {
+                    e.entity_id: (e.entity_text, e.entity_type, e.confidence_score)
+                    for e in _stream_rows(pg_session, *_ENTITY_COLUMNS)
+                }
+
+                # 2. Sync Relationships together with their endpoint nodes
+                #    (one concurrent session per type)
+                connected = await self._sync_relationships(
+                    _stream_rows(pg_session, *_RELATIONSHIP_COLUMNS), entity_lookup, sync_run_id
+                )
+                
+                # 3. Sync Nodes that have no edges
+                await self._sync_nodes(session, entity_lookup, sync_run_id, exclude=connected)
+                
+                # 4. Cleanup (Deletions)
+                await self._prune_orphans(session, sync_run_id)
             
             duration = int((time.time() - start_time) * 1000)
             logger.info(f"Sync completed in {duration}ms.")
@@ -74,117 +167,169 @@ class Neo4jSyncAgent:
             raise
         finally:
             pg_session.close()
-            self.close()
+            await self.close()
 
-    def _create_indexes(self):
+    async def _create_indexes(self, session):
         """Create performance indexes in Neo4j."""
         queries = [
             # We remove the ID constraint because multiple Postgres IDs now map to one Neo4j node
             "DROP CONSTRAINT FOR (n:Entity) REQUIRE n.id IS UNIQUE IF EXISTS",
             "CREATE INDEX IF NOT EXISTS FOR (n:Entity) ON (n.name)",
-            "CREATE INDEX IF NOT EXISTS FOR (n:Entity) ON (n.type)"
+            "CREATE INDEX IF NOT EXISTS FOR (n:Entity) ON (n.type)",
+            # (name, type) is the node identity; the constraint's index serves the
+            # endpoint MERGEs and stops concurrent relationship writes duplicating nodes
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (n:Entity) REQUIRE (n.name, n.type) IS UNIQUE",
+            # supports the last_sync scan in _prune_orphans; relationship types are
+            # dynamic, and Neo4j only indexes relationship properties per type
+            "CREATE INDEX IF NOT EXISTS FOR (n:Entity) ON (n.last_sync)"
         ]
-        with self.driver.session() as session:
-            for q in queries:
-                try:
-                    session.run(q)
-                except Exception as e:
-                    logger.warning(f"Index operation failed (might be expected): {e}")
+        # schema changes cannot share a transaction with writes, so auto-commit
+        for q in queries:
+            try:
+                result = await session.run(q)
+                await result.consume()
+            except Exception as e:
+                logger.warning(f"Index operation failed (might be expected): {e}")
         logger.info("Neo4j indexes verified.")
 
-    def _sync_nodes(self, entities: List[Entity], sync_id: str):
-        """Upsert entities as Nodes."""
-        if not entities:
-            return
+    async def _sync_nodes(self, session, entity_lookup: Dict, sync_id: str, exclude: Set = frozenset()):
+        """Upsert entities as Nodes, committing every NEO4J_TX_ROWS rows server-side.
 
-        query = """
+        Entities whose ids are in exclude are skipped; sync() passes the
+        endpoints already written by _sync_relationships.
+        """
+        query = f"""
         UNWIND $batch AS row
-        MERGE (n:Entity {name: row.name, type: row.type})
-        SET n.confidence = row.confidence,
-            n.source = 'postgres',
-            n.last_sync = $sync_id
+        CALL {{
+            WITH row
+            MERGE (n:Entity {{name: row.name, type: row.type}})
+            SET n.confidence = row.confidence,
+                n.source = 'postgres',
+                n.last_sync = $sync_id
+        }} IN TRANSACTIONS OF {NEO4J_TX_ROWS} ROWS
         """
         
-        batch_data = [
-            {
-                "name": e.entity_text,
-                "type": e.entity_type,
-                "confidence": e.confidence_score
-            }
-            for e in entities
-        ]
-        
-        with self.driver.session() as session:
-            session.run(query, batch=batch_data, sync_id=sync_id)
-            logger.info(f"Upserted {len(batch_data)} nodes in Neo4j.")
+        count = 0
+        entities = (info for entity_id, info in entity_lookup.items() if entity_id not in exclude)
+        for chunk in _batched(entities, SYNC_BATCH_SIZE):
+            batch_data = [
+                {
+                    "name": name,
+                    "type": entity_type,
+                    "confidence": confidence
+                }
+                for name, entity_type, confidence in chunk
+            ]
+            await _run_batch(session, query, batch_data, sync_id=sync_id)
+            count += len(batch_data)
+        logger.info(f"Upserted {count} nodes in Neo4j.")
 
-    def _sync_relationships(self, relationships: List[Relationship], entities: List[Entity], sync_id: str):
-        """Upsert relationships as Edges."""
-        if not relationships:
-            return
-            
-        # Build lookup for Entity ID -> (Name, Type)
-        entity_lookup = {e.entity_id: (e.entity_text, e.entity_type) for e in entities}
-
-        # Group by type to handle dynamic relationship types in Cypher
-        grouped = {}
-        for r in relationships:
-            src_info = entity_lookup.get(r.source_entity_id)
-            tgt_info = entity_lookup.get(r.target_entity_id)
-            
-            if not src_info or not tgt_info:
-                continue
-                
-            r_type = self._sanitize_rel_type(r.relationship_type)
-            if r_type not in grouped:
-                grouped[r_type] = []
-            grouped[r_type].append({
-                "source_name": src_info[0], "source_type": src_info[1],
-                "target_name": tgt_info[0], "target_type": tgt_info[1],
-                "confidence": r.confidence_score
-            })
-
-        with self.driver.session() as session:
-            count = 0
-            for r_type, batch in grouped.items():
-                # Dynamic Cypher construction for Relationship Type
-                query = f"""
-                UNWIND $batch AS row
-                MATCH (s:Entity {{name: row.source_name, type: row.source_type}})
-                MATCH (t:Entity {{name: row.target_name, type: row.target_type}})
+    async def _sync_relationships(self, relationships: Iterable, entity_lookup: Dict, sync_id: str) -> Set:
+        """Upsert relationships as Edges, MERGEing both endpoint nodes in the same query.
+
+        Returns the Postgres ids of entities written as endpoints, so only
+        isolated nodes are left for _sync_nodes.
+        """
+        connected = set()
+
+        # keep concurrent sessions within the pool (one slot left for the shared session)
+        limit = asyncio.Semaphore(max(1, NEO4J_DRIVER_OPTIONS["max_connection_pool_size"] - 1))
+
+        async def _write_type(r_type: str, batch: List[Dict[str, Any]]) -> int:
+            # Dynamic Cypher construction for Relationship Type
+            query = f"""
+            UNWIND $batch AS row
+            CALL {{
+                WITH row
+                MERGE (s:Entity {{name: row.source_name, type: row.source_type}})
+                SET s.confidence = row.source_confidence,
+                    s.source = 'postgres',
+                    s.last_sync = $sync_id
+                MERGE (t:Entity {{name: row.target_name, type: row.target_type}})
+                SET t.confidence = row.target_confidence,
+                    t.source = 'postgres',
+                    t.last_sync = $sync_id
                 MERGE (s)-[r:{r_type}]->(t)
                 SET r.confidence = row.confidence,
                     r.last_sync = $sync_id
-                """
-                session.run(query, batch=batch, sync_id=sync_id)
-                count += len(batch)
-            logger.info(f"Upserted {count} relationships in Neo4j.")
-
-    def _prune_orphans(self, sync_id: str):
-        """Remove Nodes/Edges in Neo4j that were not updated in this sync run."""
-        with self.driver.session() as session:
-            # Prune Edges
-            session.run("""
-            MATCH ()-[r]->()
-            WHERE r.last_sync <> $sync_id
-            DELETE r
-            """, sync_id=sync_id)
+            }} IN TRANSACTIONS OF {NEO4J_TX_ROWS} ROWS
+            """
+            # sessions are not safe for concurrent use, so each type gets its own
+            async with limit:
+                await _run_batch_with_retry(self.driver, query, batch, sync_id=sync_id)
+            return len(batch)
+
+        count = 0
+        for chunk in _batched(relationships, SYNC_BATCH_SIZE):
+            # Group by type to handle dynamic relationship types in Cypher
+            grouped = {}
+            for r in chunk:
+                src_info = entity_lookup.get(r.source_entity_id)
+                tgt_info = entity_lookup.get(r.target_entity_id)
                 
-            # Prune Nodes
-            session.run("""
-            MATCH (n:Entity)
-            WHERE n.last_sync <> $sync_id
+                if not src_info or not tgt_info:
+                    continue
+                    
+                r_type = self._sanitize_rel_type(r.relationship_type)
+                if r_type not in grouped:
+                    grouped[r_type] = []
+                grouped[r_type].append({
+                    "source_name": src_info[0], "source_type": src_info[1],
+                    "source_confidence": src_info[2],
+                    "target_name": tgt_info[0], "target_type": tgt_info[1],
+                    "target_confidence": tgt_info[2],
+                    "confidence": r.confidence_score
+                })
+                connected.add(r.source_entity_id)
+                connected.add(r.target_entity_id)
+
+            counts = await asyncio.gather(*(_write_type(t, b) for t, b in grouped.items()))
+            count += sum(counts)
+        logger.info(f"Upserted {count} relationships in Neo4j.")
+        return connected
+
+    async def _prune_orphans(self, session, sync_id: str):
+        """Remove Nodes/Edges in Neo4j that were not updated in this sync run.
+
+        Deletes commit every PRUNE_TX_ROWS rows so a large prune does not
+        hold every lock (and its undo state) in one transaction. Runs as
+        auto-commit, which CALL { ... } IN TRANSACTIONS requires.
+        """
+        # Prune Edges
+        result = await session.run(f"""
+        MATCH ()-[r]->()
+        WHERE r.last_sync <> $sync_id
+        CALL {{
+            WITH r
+            DELETE r
+        }} IN TRANSACTIONS OF {PRUNE_TX_ROWS} ROWS
+        """, sync_id=sync_id)
+        await result.consume()
+            
+        # Prune Nodes
+        result = await session.run(f"""
+        MATCH (n:Entity)
+        WHERE n.last_sync <> $sync_id
+        CALL {{
+            WITH n
             DETACH DELETE n
-            """, sync_id=sync_id)
-                
-            logger.info("Pruning complete.")
+        }} IN TRANSACTIONS OF {PRUNE_TX_ROWS} ROWS
+        """, sync_id=sync_id)
+        await result.consume()
+            
+        logger.info("Pruning complete.")
 
-    def _sanitize_rel_type(self, text: str) -> str:
-        """Ensure relationship type is safe for Cypher."""
-        # Replace spaces with underscores, uppercase, remove non-alphanumeric
-        safe = "".join(c if c.isalnum() else "_" for c in text)
-        return safe.upper()
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _sanitize_rel_type(text: str) -> str:
+        """Ensure relationship type is safe for Cypher.
+
+        Memoized: a sync sees only a handful of distinct types but calls
+        this once per relationship.
+        """
+        # Replace every non-alphanumeric character with an underscore, uppercase
+        return _NON_ALNUM.sub("_", text).upper()
 
 if __name__ == "__main__":
     agent = Neo4jSyncAgent()
-    agent.sync()
\ No newline at end of file
+    asyncio.run(agent.sync())
\ No newline at end of file
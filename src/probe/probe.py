@@ -3,13 +3,7 @@ from pathlib import Path
 import pdfplumber
 
 
-def sample_pages(pdf_path: str, n: int = 3):
-    """Return a list of page indices to sample (0-based).
-
-    Picks start, middle, end when possible, otherwise evenly spaced.
-    """
-    with pdfplumber.open(pdf_path) as pdf:
-        total = len(pdf.pages)
+def _sample_indices(total: int, n: int) -> list:
     if total == 0:
         return []
     if n <= 0:
@@ -27,39 +21,58 @@ def sample_pages(pdf_path: str, n: int = 3):
     return indices
 
 
+def sample_pages(pdf_path: str, n: int = 3):
+    """Return a list of page indices to sample (0-based).
+
+    Picks start, middle, end when possible, otherwise evenly spaced.
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        return sample_pages_from_pdf(pdf, n)
+
+
+def sample_pages_from_pdf(pdf, n: int = 3):
+    """Like sample_pages, for a PDF the caller already has open."""
+    return _sample_indices(len(pdf.pages), n)
+
+
+def _analyze_pdf_page(pdf, page_number: int) -> dict:
+    """Analyze one page of an already-open pdfplumber PDF."""
+    if page_number < 0 or page_number >= len(pdf.pages):
+        raise IndexError("page_number out of range")
+    page = pdf.pages[page_number]
+    # text
+    try:
+        text = page.extract_text() or ""
+    except Exception:
+        text = ""
+    text_length = len(text)
+    # images
+    try:
+        images = page.images or []
+        image_count = len(images)
+    except Exception:
+        image_count = 0
+    # tables
+    try:
+        tables = page.find_tables()
+        table_count = len(tables) if tables is not None else 0
+    except Exception:
+        # fallback to heuristic
+        table_count = 0
+    is_text_layer = text_length > 20  # heuristic
+    return {
+        "page_number": page_number,
+        "text_length": text_length,
+        "image_count": image_count,
+        "table_count": table_count,
+        "is_text_layer": is_text_layer,
+    }
+
+
 def analyze_page(pdf_path: str, page_number: int) -> dict:
     """Analyze a single page and return structural signals."""
     with pdfplumber.open(pdf_path) as pdf:
-        if page_number < 0 or page_number >= len(pdf.pages):
-            raise IndexError("page_number out of range")
-        page = pdf.pages[page_number]
-        # text
-        try:
-            text = page.extract_text() or ""
-        except Exception:
-            text = ""
-        text_length = len(text)
-        # images
-        try:
-            images = page.images or []
-            image_count = len(images)
-        except Exception:
-            image_count = 0
-        # tables
-        try:
-            tables = page.find_tables()
-            table_count = len(tables) if tables is not None else 0
-        except Exception:
-            # fallback to heuristic
-            table_count = 0
-        is_text_layer = text_length > 20  # heuristic
-        return {
-            "page_number": page_number,
-            "text_length": text_length,
-            "image_count": image_count,
-            "table_count": table_count,
-            "is_text_layer": is_text_layer,
-        }
+        return _analyze_pdf_page(pdf, page_number)
 
 
 def compute_complexity(per_page_signals: list) -> float:
@@ -108,13 +121,15 @@ def recommend_action(per_page_signals: list) -> str:
 
 def probe_document(pdf_path: str, n_samples: int = 3) -> dict:
     pdf_path = str(pdf_path)
-    indices = sample_pages(pdf_path, n_samples)
     per_page = []
-    for idx in indices:
-        try:
-            per_page.append(analyze_page(pdf_path, idx))
-        except Exception as e:
-            per_page.append({"page_number": idx, "error": str(e)})
+    # one open serves sampling and every page analysis
+    with pdfplumber.open(pdf_path) as pdf:
+        indices = sample_pages_from_pdf(pdf, n_samples)
+        for idx in indices:
+            try:
+                per_page.append(_analyze_pdf_page(pdf, idx))
+            except Exception as e:
+                per_page.append({"page_number": idx, "error": str(e)})
     complexity = compute_complexity([p for p in per_page if "error" not in p])
     action = recommend_action([p for p in per_page if "error" not in p])
     summary = {
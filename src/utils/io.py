@@ -1,4 +1,18 @@
+import hashlib
+import mmap
+import os
 from pathlib import Path
 
 def ensure_dir(path: Path):
     path.mkdir(parents=True, exist_ok=True)
+
+
+def file_sha256(path) -> str:
+    """Hex SHA-256 of a file, read through a read-only memory map."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        # mmap cannot map an empty file
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                digest.update(mm)
+    return digest.hexdigest()
@@ -0,0 +1,38 @@
+"""Token counting helpers backed by tiktoken."""
+
+import os
+from functools import lru_cache
+from typing import List
+
+import tiktoken
+
+
+@lru_cache(maxsize=None)
+def _encoding():
+    """The cl100k_base encoding, loaded on first use.
+
+    Loading may download the BPE file on a cold cache, so importing this
+    module must not trigger it.
+    """
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str) -> int:
+    """Count model tokens in a single string."""
+    return len(_encoding().encode_ordinary(text))
+
+
+def batch_token_counts(texts: List[str]) -> List[int]:
+    """Count model tokens for many strings in one batched encode call."""
+    if not texts:
+        return []
+    return [len(t) for t in _encoding().encode_ordinary_batch(texts, num_threads=os.cpu_count())]
+
+
+@lru_cache(maxsize=256)
+def truncate_to_tokens(text: str, n: int) -> str:
+    """Cut text to at most n tokens, splitting on a token boundary."""
+    ids = _encoding().encode_ordinary(text)
+    if len(ids) <= n:
+        return text
+    return _encoding().decode(ids[:n])
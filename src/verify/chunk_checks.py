@@ -1,11 +1,64 @@
 """Verification helpers for adaptive chunking."""
 
 from ..db import get_session
-from ..db.models import Document, Block, Chunk
-from sqlalchemy import func
+from sqlalchemy import text
 
 
-def verify_chunks(document_id):
+# All chunk statistics for one document in a single round trip (PostgreSQL).
+_VERIFY_CHUNKS_SQL = text("""
+WITH doc_blocks AS (
+    SELECT id FROM blocks WHERE document_id = :doc_id
+),
+doc_chunks AS (
+    SELECT block_id, chunk_text, token_count, creation_method
+    FROM chunks WHERE document_id = :doc_id
+),
+chunk_stats AS (
+    SELECT
+        COUNT(*) AS chunk_count,
+        COUNT(*) FILTER (WHERE length(chunk_text) < 5) AS empty_chunks,
+        MIN(token_count) AS token_min,
+        MAX(token_count) AS token_max,
+        AVG(token_count) AS token_avg
+    FROM doc_chunks
+),
+-- per-block breakdown is one row per block, so only built when asked for
+block_chunks AS (
+    SELECT b.id, COUNT(c.block_id) AS chunk_count
+    FROM doc_blocks b LEFT JOIN doc_chunks c ON c.block_id = b.id
+    WHERE CAST(:verbose AS boolean)
+    GROUP BY b.id
+),
+methods AS (
+    SELECT COALESCE(creation_method, 'unknown') AS creation_method, COUNT(*) AS n
+    FROM doc_chunks GROUP BY 1
+)
+SELECT json_build_object(
+    'document_exists', EXISTS (SELECT 1 FROM documents WHERE document_id = :doc_id),
+    'blocks_total', (SELECT COUNT(*) FROM doc_blocks),
+    'chunks_total', s.chunk_count,
+    'empty_chunks', s.empty_chunks,
+    'token_min', s.token_min,
+    'token_max', s.token_max,
+    'token_avg', s.token_avg,
+    'missing_chunks', (
+        SELECT COUNT(*) FROM doc_blocks b
+        WHERE NOT EXISTS (
+            SELECT 1 FROM chunks c WHERE c.document_id = :doc_id AND c.block_id = b.id
+        )
+    ),
+    'chunks_per_block', (
+        SELECT COALESCE(json_object_agg(id::text, chunk_count), '{}'::json) FROM block_chunks
+    ),
+    'creation_methods', (
+        SELECT COALESCE(json_object_agg(creation_method, n), '{}'::json) FROM methods
+    )
+)
+FROM chunk_stats s
+""")
+
+
+def verify_chunks(document_id, verbose: bool = False):
     """Verify chunks are correct and complete.
 
     Checks:
@@ -14,66 +67,40 @@ def verify_chunks(document_id):
     - Chunk content aligns with block content
     - Token counts are reasonable
     - Traceability is preserved
+
+    The per-block chunk counts are only included when verbose is set.
     """
-    session = get_session()
-    doc = session.query(Document).filter(Document.document_id == document_id).one_or_none()
-    if not doc:
+    with get_session() as session:
+        stats = session.execute(_VERIFY_CHUNKS_SQL, {"doc_id": str(document_id), "verbose": verbose}).scalar_one()
+    if not stats["document_exists"]:
         return {"error": "document not found"}
 
-    # stats
-    block_count = session.query(func.count(Block.id)).filter(Block.document_id == document_id).scalar()
-    chunk_count = session.query(func.count(Chunk.chunk_id)).filter(Chunk.document_id == document_id).scalar()
-
-    # per-block chunk distribution
-    block_chunks = session.query(
-        Block.id,
-        Block.block_type,
-        func.count(Chunk.chunk_id).label("chunk_count")
-    ).outerjoin(
-        Chunk, Block.id == Chunk.block_id
-    ).filter(Block.document_id == document_id).group_by(Block.id, Block.block_type).all()
-
     issues = []
 
     # check for empty chunks
-    empty_chunks = session.query(func.count(Chunk.chunk_id)).filter(
-        Chunk.document_id == document_id,
-        func.length(Chunk.chunk_text) < 5
-    ).scalar()
+    empty_chunks = stats["empty_chunks"]
     if empty_chunks > 0:
         issues.append(f"{empty_chunks} empty chunks detected")
 
     # check for missing blocks (blocks with 0 chunks)
-    missing_chunks = [b for b in block_chunks if b.chunk_count == 0]
-    if missing_chunks:
-        issues.append(f"{len(missing_chunks)} blocks have no chunks")
-
-    # token count stats
-    token_stats = session.query(
-        func.min(Chunk.token_count),
-        func.max(Chunk.token_count),
-        func.avg(Chunk.token_count)
-    ).filter(Chunk.document_id == document_id).one()
-    token_min, token_max, token_avg = token_stats
-
-    # creation method breakdown
-    methods = session.query(
-        Chunk.creation_method,
-        func.count(Chunk.chunk_id)
-    ).filter(Chunk.document_id == document_id).group_by(Chunk.creation_method).all()
+    missing_chunks = stats["missing_chunks"]
+    if missing_chunks > 0:
+        issues.append(f"{missing_chunks} blocks have no chunks")
 
+    token_avg = stats["token_avg"]
     report = {
         "document_id": str(document_id),
-        "blocks_total": block_count,
-        "chunks_total": chunk_count,
-        "chunks_per_block": {str(b.id): b.chunk_count for b in block_chunks},
+        "blocks_total": stats["blocks_total"],
+        "chunks_total": stats["chunks_total"],
         "token_stats": {
-            "min": token_min,
-            "max": token_max,
+            "min": stats["token_min"],
+            "max": stats["token_max"],
             "avg": round(token_avg, 2) if token_avg else None,
         },
-        "creation_methods": {method: count for method, count in methods},
+        "creation_methods": stats["creation_methods"],
         "issues": issues,
         "overall": "pass" if not issues else "fail",
     }
+    if verbose:
+        report["chunks_per_block"] = stats["chunks_per_block"]
     return report
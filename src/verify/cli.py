@@ -2,8 +2,10 @@
 
 import click
 import json
-from .sql_audit import audit_document, list_documents_status
+from .sql_audit import audit_document, iter_documents_status
 from .cross_check import cross_check_document
+from .chunk_checks import verify_chunks
+from .phase1_checks import verify_file_matches_metadata
 
 
 @click.group()
@@ -25,20 +27,45 @@ def audit(document_id):
 @cli.command()
 @click.argument('document_id')
 @click.option('--samples', default=3, help='Number of blocks to sample for validation')
-def validate(document_id, samples):
+@click.option('--force', is_flag=True, help='Re-check even if the PDF and blocks are unchanged since the last pass')
+def validate(document_id, samples, force):
     """Cross-check extracted blocks against source PDF.
 
     Samples blocks from DB and re-extracts to compare (allows ±10% variance).
     """
-    report = cross_check_document(document_id, sample_size=samples)
+    report = cross_check_document(document_id, sample_size=samples, force=force)
     click.echo(json.dumps(report, indent=2, default=str))
 
 
 @cli.command()
-def status():
+@click.argument('document_id')
+@click.option('--verbose', is_flag=True, help='Include chunk counts for every block')
+def chunks(document_id, verbose):
+    """Verify chunk counts, token stats and empty or missing chunks."""
+    report = verify_chunks(document_id, verbose=verbose)
+    click.echo(json.dumps(report, indent=2, default=str))
+
+
+@cli.command()
+@click.argument('document_id')
+@click.option('--check-hash', is_flag=True, help='Also compare the file\'s SHA-256 with the stored hash')
+def file(document_id, check_hash):
+    """Check the stored PDF still matches its document record."""
+    ok, detail = verify_file_matches_metadata(document_id, check_hash=check_hash)
+    click.echo(json.dumps({"document_id": document_id, "ok": ok, "detail": detail}, indent=2))
+
+
+@cli.command()
+@click.option('--page-size', default=100, type=click.IntRange(min=1), help='Documents fetched per query')
+def status(page_size):
     """List all documents and their ingestion status."""
-    docs = list_documents_status()
-    click.echo(json.dumps(docs, indent=2, default=str))
+    # stream a JSON array page by page instead of holding every document
+    click.echo("[")
+    for i, doc in enumerate(iter_documents_status(page_size=page_size)):
+        if i:
+            click.echo(",")
+        click.echo(json.dumps(doc, indent=2, default=str), nl=False)
+    click.echo("\n]")
 
 
 if __name__ == '__main__':
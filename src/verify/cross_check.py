@@ -1,60 +1,200 @@
 """Cross-validation: compare extracted blocks with source PDF."""
 
-import random
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable
+
+import numpy as np
+from sqlalchemy import func, update
+from sqlalchemy.orm import load_only, raiseload
+
+from ..config import XCHECK_CACHE_MAX_AGE, XCHECK_CACHE_PATH
 from ..db import get_session
 from ..db.models import Document, Block
-from ..ingest.parsing import extract_text_from_page
+from ..ingest.parsing import extract_text_from_pages
+from ..utils.io import file_sha256
 
+# allowed relative difference between stored and re-extracted text length
+VARIANCE_THRESHOLD = 0.1
+
+
+def _file_key(file_path: str) -> str:
+    """Cache key for a file version: "<path hash>/<mtime>".
+
+    All versions of one file share the path-hash directory, so older
+    versions can be pruned when the file changes.
+    """
+    mtime = os.stat(file_path).st_mtime_ns
+    path_hash = hashlib.md5(os.path.abspath(file_path).encode()).hexdigest()
+    return f"{path_hash}/{mtime}"
 
-def cross_check_document(document_id, sample_size=3):
-    """Sample blocks from DB and compare with fresh extraction from PDF.
 
-    Returns validation report with pass/fail and variance info.
+@lru_cache(maxsize=1024)
+def _cached_page_text(file_key: str, page_number: int) -> str:
+    """Read a previously extracted page from the on-disk cache.
+
+    Raises OSError on a miss; lru_cache does not cache exceptions, so a
+    page is memoized in-process only once it is on disk.
     """
-    session = get_session()
-    doc = session.query(Document).filter(Document.document_id == document_id).one_or_none()
-    if not doc:
-        return {"error": "document not found"}
+    return (XCHECK_CACHE_PATH / file_key / f"{page_number}.txt").read_text(encoding="utf-8")
+
 
-    # get all text blocks
-    blocks = session.query(Block).filter(
-        Block.document_id == document_id,
-        Block.block_type == "text"
-    ).all()
+def _prune_cache(version_dir: Path) -> None:
+    """Drop other versions of this file and files not checked for XCHECK_CACHE_MAX_AGE."""
+    for old in version_dir.parent.iterdir():
+        if old != version_dir:
+            shutil.rmtree(old, ignore_errors=True)
+    cutoff = time.time() - XCHECK_CACHE_MAX_AGE
+    for file_dir in XCHECK_CACHE_PATH.iterdir():
+        if file_dir.stat().st_mtime < cutoff:
+            shutil.rmtree(file_dir, ignore_errors=True)
 
-    if not blocks:
-        return {"error": "no text blocks found to validate"}
 
-    sample_blocks = random.sample(blocks, min(sample_size, len(blocks)))
-    validations = []
+def _store_page_text(file_key: str, page_number: int, text: str) -> None:
+    try:
+        cache_dir = XCHECK_CACHE_PATH / file_key
+        if not cache_dir.exists():
+            cache_dir.mkdir(parents=True)
+            _prune_cache(cache_dir)
+        # write then rename, so a crash never leaves a truncated page to be served
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, cache_dir / f"{page_number}.txt")
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        # the cache is an optimization only
+        pass
+
 
-    for block in sample_blocks:
-        # re-extract from PDF
+def _fresh_page_texts(file_path: str, page_numbers: Iterable[int]) -> Dict[int, str]:
+    """Text of each page as extracted from the PDF, served from cache when unchanged."""
+    file_key = _file_key(file_path)
+    texts = {}
+    misses = []
+    for page_number in set(page_numbers):
         try:
-            fresh = extract_text_from_page(doc.file_path, block.page_number)
-            fresh_len = len(fresh.content.strip())
-        except Exception as e:
-            validations.append({
+            texts[page_number] = _cached_page_text(file_key, page_number)
+        except OSError:
+            misses.append(page_number)
+
+    if misses:
+        for page_number, fresh in extract_text_from_pages(file_path, misses).items():
+            texts[page_number] = fresh.content
+            # failed extractions are reported but never cached
+            if fresh.extraction_method != "pdfplumber_text_error":
+                _store_page_text(file_key, page_number, fresh.content)
+    return texts
+
+
+def _check_fingerprint(file_path: str, block_count: int, last_block_id) -> str:
+    """Hash of the PDF contents plus the text-block set a cross-check ran against.
+
+    Returns None when the file cannot be read.
+    """
+    try:
+        file_digest = file_sha256(file_path)
+    except OSError:
+        return None
+    return hashlib.sha256(f"{file_digest}:{block_count}:{last_block_id}".encode()).hexdigest()
+
+
+def cross_check_document(document_id, sample_size=3, force=False):
+    """Sample blocks from DB and compare with fresh extraction from PDF.
+
+    Returns validation report with pass/fail and variance info. If the PDF
+    and the document's text blocks are unchanged since the last passing
+    check, returns a cached pass without re-extracting (unless force).
+    """
+    with get_session() as session:
+        doc = (
+            session.query(Document)
+            .options(
+                load_only(Document.file_path, Document.last_cross_check_hash, raiseload=True),
+                raiseload("*"),
+            )
+            .filter(Document.document_id == document_id)
+            .one_or_none()
+        )
+        if not doc:
+            return {"error": "document not found"}
+
+        block_count, last_block_id = session.query(func.count(Block.id), func.max(Block.id)).filter(
+            Block.document_id == document_id,
+            Block.block_type == "text"
+        ).one()
+        fingerprint = _check_fingerprint(doc.file_path, block_count, last_block_id)
+        if not force and fingerprint is not None and fingerprint == doc.last_cross_check_hash:
+            return {"document_id": str(document_id), "overall": "pass", "cached": True}
+
+        # sample text blocks in the database rather than fetching them all
+        sample_blocks = (
+            session.query(Block)
+            .options(load_only(Block.page_number, Block.content, raiseload=True), raiseload("*"))
+            .filter(
+                Block.document_id == document_id,
+                Block.block_type == "text"
+            )
+            .order_by(func.random())
+            .limit(sample_size)
+            .all()
+        )
+
+        if not sample_blocks:
+            return {"error": "no text blocks found to validate"}
+
+    # re-extract every sampled page from the PDF in one open (cached pages are skipped)
+    try:
+        fresh_pages = _fresh_page_texts(doc.file_path, [b.page_number for b in sample_blocks])
+        extract_error = None
+    except Exception as e:
+        fresh_pages = {}
+        extract_error = str(e)
+
+    # blocks whose page could not be re-extracted are errors; the rest are
+    # compared in one vectorized pass, keeping the sampled order
+    validations = [None] * len(sample_blocks)
+    checked = []
+    for i, block in enumerate(sample_blocks):
+        if block.page_number in fresh_pages:
+            checked.append(i)
+        else:
+            validations[i] = {
                 "page_number": block.page_number,
                 "status": "error",
-                "error": str(e),
-            })
-            continue
-
-        db_len = len(block.content.strip())
+                "error": extract_error or "page_number out of range",
+            }
 
+    if checked:
+        db_lens = np.fromiter(
+            (len(sample_blocks[i].content.strip()) for i in checked), dtype=np.int64, count=len(checked)
+        )
+        fresh_lens = np.fromiter(
+            (len(fresh_pages[sample_blocks[i].page_number].strip()) for i in checked),
+            dtype=np.int64,
+            count=len(checked),
+        )
         # allow 10% variance
-        variance = abs(fresh_len - db_len) / max(1, db_len)
-        threshold = 0.1
-        status = "pass" if variance <= threshold else "fail"
-
-        validations.append({
-            "page_number": block.page_number,
-            "db_content_length": db_len,
-            "fresh_content_length": fresh_len,
-            "variance": round(variance, 3),
-            "status": status,
-        })
+        variances = np.abs(fresh_lens - db_lens) / np.maximum(1, db_lens)
+        passed = variances <= VARIANCE_THRESHOLD
+        for i, db_len, fresh_len, variance, ok in zip(
+            checked, db_lens.tolist(), fresh_lens.tolist(), variances.tolist(), passed.tolist()
+        ):
+            validations[i] = {
+                "page_number": sample_blocks[i].page_number,
+                "db_content_length": db_len,
+                "fresh_content_length": fresh_len,
+                "variance": round(variance, 3),
+                "status": "pass" if ok else "fail",
+            }
 
     issues = [v for v in validations if v["status"] != "pass"]
     report = {
@@ -64,4 +204,14 @@ def cross_check_document(document_id, sample_size=3):
         "issues": issues,
         "overall": "pass" if not issues else "fail",
     }
+
+    # remember a passing check so unchanged documents can skip the next one
+    if not issues and fingerprint is not None:
+        with get_session() as session:
+            session.execute(
+                update(Document)
+                .where(Document.document_id == document_id)
+                .values(last_cross_check_hash=fingerprint)
+            )
+            session.commit()
     return report
@@ -1,11 +1,20 @@
+from sqlalchemy import func, text
+
 from src.db import get_session
 from src.db.models import Embedding, Chunk
 
 
+_EMBEDDING_COUNTS_SQL = text("""
+SELECT
+    (SELECT count(*) FROM chunks WHERE document_id = :d AND confidence_score IS NOT NULL) AS chunk_count,
+    (SELECT count(*) FROM embeddings WHERE document_id = :d) AS emb_count
+""")
+
+
 def embedding_count_check(document_id: str) -> dict:
     with get_session() as session:
-        chunk_count = session.query(Chunk).filter(Chunk.document_id == document_id, Chunk.confidence_score != None).count()
-        emb_count = session.query(Embedding).filter(Embedding.document_id == document_id).count()
+        # both counts in one round trip
+        chunk_count, emb_count = session.execute(_EMBEDDING_COUNTS_SQL, {"d": str(document_id)}).one()
         issues = []
         if emb_count == 0:
             issues.append("no_embeddings_found")
@@ -15,20 +24,22 @@ def embedding_count_check(document_id: str) -> dict:
 
 
 def sample_retrieval_check(document_id: str, sample_queries: list, model_name: str = "sentence-transformers/all-MiniLM-L6-v2") -> dict:
-    from src.embeddings.embeddings import query_document_index
-    results = {}
-    for q in sample_queries:
-        res = query_document_index(document_id, q, top_k=3, model_name=model_name)
-        results[q] = res
+    from src.embeddings.embeddings import query_document_index_batch
+    # one model load, one encode call and one index search for all queries
+    matches = query_document_index_batch(document_id, sample_queries, top_k=3, model_name=model_name)
+    results = dict(zip(sample_queries, matches))
     return {"document_id": document_id, "samples": results}
 
 
 def traceability_check(document_id: str) -> dict:
     with get_session() as session:
-        emb_records = session.query(Embedding).filter(Embedding.document_id == document_id).all()
-        missing_chunks = []
-        for e in emb_records:
-            c = session.query(Chunk).filter(Chunk.chunk_id == e.chunk_id).first()
-            if not c:
-                missing_chunks.append(str(e.chunk_id))
-        return {"document_id": document_id, "embeddings": len(emb_records), "missing_chunk_refs": missing_chunks}
+        emb_count = session.query(func.count(Embedding.id)).filter(Embedding.document_id == document_id).scalar()
+        # embeddings whose chunk no longer exists, found in one outer join
+        orphans = (
+            session.query(Embedding.chunk_id)
+            .outerjoin(Chunk, Chunk.chunk_id == Embedding.chunk_id)
+            .filter(Embedding.document_id == document_id, Chunk.chunk_id.is_(None))
+            .all()
+        )
+        missing_chunks = [str(chunk_id) for (chunk_id,) in orphans]
+        return {"document_id": document_id, "embeddings": emb_count, "missing_chunk_refs": missing_chunks}
@@ -5,14 +5,22 @@ and metadata matches the stored file.
 """
 from ..db import get_session
 from ..db.models import Document
+from sqlalchemy.orm import raiseload
+from ..utils.io import file_sha256
 from pathlib import Path
 
 def check_document_exists(document_id):
-    session = get_session()
-    doc = session.query(Document).filter(Document.document_id == document_id).one_or_none()
+    # the returned Document is detached; its loaded columns stay readable
+    with get_session() as session:
+        doc = session.query(Document).options(raiseload("*")).filter(Document.document_id == document_id).one_or_none()
     return doc
 
-def verify_file_matches_metadata(document_id):
+def verify_file_matches_metadata(document_id, check_hash=False):
+    """Check the stored file against its document record.
+
+    Always compares sizes; with check_hash, also compares the file's
+    SHA-256 with documents.file_hash (skipped when the size already differs).
+    """
     doc = check_document_exists(document_id)
     if not doc:
         return False, 'document not found'
@@ -22,4 +30,10 @@ def verify_file_matches_metadata(document_id):
     size = path.stat().st_size
     if doc.file_size_bytes != size:
         return False, f'size mismatch db={doc.file_size_bytes} fs={size}'
+    if check_hash:
+        if not doc.file_hash:
+            return False, 'no stored hash'
+        digest = file_sha256(path)
+        if digest != doc.file_hash:
+            return False, f'hash mismatch db={doc.file_hash} fs={digest}'
     return True, 'ok'
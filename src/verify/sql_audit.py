@@ -2,100 +2,166 @@
 
 from ..db import get_session
 from ..db.models import Document, Block
-from sqlalchemy import func
+from sqlalchemy import DateTime, bindparam, case, func, literal, select, text, tuple_
+from sqlalchemy.orm import load_only, raiseload
+import datetime
 import uuid
 
 
+# the Document fields the audit and status reports read; verify queries load
+# only what they use and raise on any other column or relationship access,
+# so a lazy load (and the N+1 it brings) fails loudly instead of slowing down
+_DOCUMENT_REPORT_COLUMNS = (Document.filename, Document.ingestion_status, Document.page_count)
+
+# Statements are built once at import with a doc_id bind parameter, so
+# repeated audits reuse SQLAlchemy's compiled form instead of rebuilding it.
+_DOCUMENT_STMT = (
+    select(Document)
+    .options(load_only(*_DOCUMENT_REPORT_COLUMNS, raiseload=True), raiseload("*"))
+    .where(Document.document_id == bindparam("doc_id"))
+)
+
+# block counts and confidence/page stats in one pass over the document's blocks
+_BLOCK_STATS_STMT = select(
+    func.count(Block.id),
+    func.coalesce(func.sum(case((Block.block_type == "text", 1), else_=0)), 0),
+    func.coalesce(func.sum(case((Block.block_type.like("table_%"), 1), else_=0)), 0),
+    func.min(Block.confidence),
+    func.max(Block.confidence),
+    func.avg(Block.confidence),
+    func.coalesce(func.sum(case((Block.confidence < 50, 1), else_=0)), 0),
+    func.min(Block.page_number),
+    func.max(Block.page_number),
+).where(Block.document_id == bindparam("doc_id"))
+
+_METHODS_STMT = (
+    select(Block.extraction_method, func.count(Block.id))
+    .where(Block.document_id == bindparam("doc_id"))
+    .group_by(Block.extraction_method)
+)
+
+# created_at is nullable and a NULL in the keyset comparison would end
+# pagination early, so documents are paged on created_at with NULL
+# mapped to a far-future value
+_NULL_CREATED_AT = datetime.datetime(9999, 12, 31)
+_CREATED_SORT_KEY = func.coalesce(Document.created_at, literal(_NULL_CREATED_AT, DateTime))
+
+# pages between the first and last block page that have no blocks (PostgreSQL)
+_MISSING_PAGES_SQL = text("""
+SELECT p FROM generate_series(CAST(:lo AS integer), CAST(:hi AS integer)) AS p
+EXCEPT
+SELECT page_number FROM blocks WHERE document_id = :doc_id
+ORDER BY 1
+""")
+
+
 def audit_document(document_id):
     """Run comprehensive audit on a document.
 
     Returns dict with statistics and any issues found.
     """
-    session = get_session()
-    doc = session.query(Document).filter(Document.document_id == document_id).one_or_none()
-    if not doc:
-        return {"error": "document not found"}
-
-    # basic stats
-    block_count = session.query(func.count(Block.id)).filter(Block.document_id == document_id).scalar()
-    text_blocks = session.query(func.count(Block.id)).filter(
-        Block.document_id == document_id,
-        Block.block_type == "text"
-    ).scalar()
-    table_blocks = session.query(func.count(Block.id)).filter(
-        Block.document_id == document_id,
-        Block.block_type.like("table_%")
-    ).scalar()
-
-    # confidence stats
-    conf_stats = session.query(
-        func.min(Block.confidence),
-        func.max(Block.confidence),
-        func.avg(Block.confidence)
-    ).filter(Block.document_id == document_id).one()
-    conf_min, conf_max, conf_avg = conf_stats
-
-    # extraction method breakdown
-    methods = session.query(
-        Block.extraction_method,
-        func.count(Block.id)
-    ).filter(Block.document_id == document_id).group_by(Block.extraction_method).all()
-
-    issues = []
-
-    # check for gaps in page numbers
-    page_numbers = session.query(func.distinct(Block.page_number)).filter(
-        Block.document_id == document_id
-    ).order_by(Block.page_number).all()
-    page_numbers = [p[0] for p in page_numbers]
-    if page_numbers:
-        expected_pages = set(range(min(page_numbers), max(page_numbers) + 1))
-        actual_pages = set(page_numbers)
-        missing = expected_pages - actual_pages
-        if missing:
-            issues.append(f"Missing pages: {sorted(missing)}")
-
-    # check for low confidence blocks
-    low_conf = session.query(func.count(Block.id)).filter(
-        Block.document_id == document_id,
-        Block.confidence < 50
-    ).scalar()
-    if low_conf > 0:
-        issues.append(f"{low_conf} blocks with confidence < 50")
-
-    report = {
-        "document_id": str(document_id),
-        "filename": doc.filename,
-        "ingestion_status": doc.ingestion_status.value if doc.ingestion_status else None,
-        "page_count": doc.page_count,
-        "stats": {
-            "total_blocks": block_count,
-            "text_blocks": text_blocks,
-            "table_blocks": table_blocks,
-            "confidence": {
-                "min": conf_min,
-                "max": conf_max,
-                "avg": round(conf_avg, 2) if conf_avg else None,
+    with get_session() as session:
+        params = {"doc_id": document_id}
+        doc = session.execute(_DOCUMENT_STMT, params).scalar_one_or_none()
+        if not doc:
+            return {"error": "document not found"}
+
+        # block counts and confidence stats in one pass over the document's blocks
+        (
+            block_count,
+            text_blocks,
+            table_blocks,
+            conf_min,
+            conf_max,
+            conf_avg,
+            low_conf,
+            page_min,
+            page_max,
+        ) = session.execute(_BLOCK_STATS_STMT, params).one()
+
+        # extraction method breakdown
+        methods = session.execute(_METHODS_STMT, params).all()
+
+        issues = []
+
+        # check for gaps in page numbers; only the missing pages leave the database
+        if page_min is not None:
+            missing = session.execute(
+                _MISSING_PAGES_SQL, {"doc_id": str(document_id), "lo": page_min, "hi": page_max}
+            ).scalars().all()
+            if missing:
+                issues.append(f"Missing pages: {missing}")
+
+        # check for low confidence blocks
+        if low_conf > 0:
+            issues.append(f"{low_conf} blocks with confidence < 50")
+
+        report = {
+            "document_id": str(document_id),
+            "filename": doc.filename,
+            "ingestion_status": doc.ingestion_status.value if doc.ingestion_status else None,
+            "page_count": doc.page_count,
+            "stats": {
+                "total_blocks": block_count,
+                "text_blocks": text_blocks,
+                "table_blocks": table_blocks,
+                "confidence": {
+                    "min": conf_min,
+                    "max": conf_max,
+                    "avg": round(conf_avg, 2) if conf_avg else None,
+                },
+                "extraction_methods": {method: count for method, count in methods},
             },
-            "extraction_methods": {method: count for method, count in methods},
-        },
-        "issues": issues,
-    }
-    return report
-
-
-def list_documents_status():
-    """List all documents with their ingestion status and block counts."""
-    session = get_session()
-    docs = session.query(Document).order_by(Document.created_at.desc()).all()
-    results = []
-    for doc in docs:
-        block_count = session.query(func.count(Block.id)).filter(Block.document_id == doc.document_id).scalar()
-        results.append({
+            "issues": issues,
+        }
+        return report
+
+
+def list_documents_status(page_size=100, cursor=None):
+    """Yield one page of documents with their ingestion status and block counts.
+
+    Newest first (undated documents before all others, as Postgres sorts
+    NULLs under DESC), using keyset pagination on (created_at, document_id):
+    pass the generator's return value (the StopIteration value, or the
+    result of ``yield from``) back as ``cursor`` to get the next page. It
+    is None after the last page. Use iter_documents_status to walk them all.
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1")
+    page = select(Document.document_id)
+    if cursor is not None:
+        page = page.where(tuple_(_CREATED_SORT_KEY, Document.document_id) < tuple_(*cursor))
+    page = page.order_by(_CREATED_SORT_KEY.desc(), Document.document_id.desc()).limit(page_size).subquery()
+
+    with get_session() as session:
+        rows = session.execute(
+            select(Document, func.count(Block.id))
+            .options(load_only(*_DOCUMENT_REPORT_COLUMNS, Document.created_at, raiseload=True), raiseload("*"))
+            .join(page, page.c.document_id == Document.document_id)
+            .outerjoin(Block, Block.document_id == Document.document_id)
+            .group_by(Document.document_id)
+            .order_by(_CREATED_SORT_KEY.desc(), Document.document_id.desc())
+        ).all()
+
+    for doc, block_count in rows:
+        yield {
             "document_id": str(doc.document_id),
             "filename": doc.filename,
             "status": doc.ingestion_status.value if doc.ingestion_status else None,
             "page_count": doc.page_count,
             "blocks_extracted": block_count,
-        })
-    return results
+        }
+
+    if len(rows) < page_size:
+        return None
+    last = rows[-1][0]
+    return (last.created_at or _NULL_CREATED_AT, last.document_id)
+
+
+def iter_documents_status(page_size=100):
+    """Yield the status of every document, fetching page_size rows per query."""
+    cursor = None
+    while True:
+        cursor = yield from list_documents_status(page_size, cursor)
+        if cursor is None:
+            return
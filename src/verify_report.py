@@ -1,5 +1,12 @@
 #!/usr/bin/env python3
-import json
+"""Print chunk verification reports.
+
+Usage: verify_report.py [DOCUMENT_ID ...] | --all
+With no arguments the DOCUMENT_ID below is used.
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from src.verify.chunk_checks import verify_chunks
 
 # -----------------------------
@@ -7,33 +14,77 @@ from src.verify.chunk_checks import verify_chunks
 # -----------------------------
 DOCUMENT_ID = "c5c20cb9-0cfe-424e-ad81-1f288363e7ae"
 
-# -----------------------------
-# Load the report
-# -----------------------------
-report = verify_chunks(DOCUMENT_ID)
 
-# -----------------------------
-# Print Chunks per block (text bar)
-# -----------------------------
-print("\nChunks per block:")
-for block, count in report.get("chunks_per_block", {}).items():
-    print(f"Block {block}: {'#'*count} ({count})")
+def _init_worker():
+    # connections inherited from the parent over fork must not be reused;
+    # drop them from this process's pool without closing the parent's sockets
+    from src.db.session import engine
+    engine.dispose(close=False)
 
-# -----------------------------
-# Print Token stats
-# -----------------------------
-tokens = report.get("token_stats", {})
-print("\nToken stats:")
-print(f"  min: {tokens.get('min')}")
-print(f"  max: {tokens.get('max')}")
-print(f"  avg: {tokens.get('avg')}")
 
-# -----------------------------
-# Print overall status
-# -----------------------------
-print("\nCreation methods:")
-for method, val in report.get("creation_methods", {}).items():
-    print(f"  {method}: {val}")
+def _load_report(document_id):
+    return verify_chunks(document_id, verbose=True)
+
+
+def format_report(report):
+    """Render a report as one string so it can be written in a single call."""
+    # -----------------------------
+    # Chunks per block (text bar)
+    # -----------------------------
+    lines = ["", "Chunks per block:"]
+    lines += [f"Block {block}: {'#'*count} ({count})" for block, count in report.get("chunks_per_block", {}).items()]
+
+    # -----------------------------
+    # Token stats
+    # -----------------------------
+    tokens = report.get("token_stats", {})
+    lines += [
+        "",
+        "Token stats:",
+        f"  min: {tokens.get('min')}",
+        f"  max: {tokens.get('max')}",
+        f"  avg: {tokens.get('avg')}",
+    ]
+
+    # -----------------------------
+    # Overall status
+    # -----------------------------
+    lines += ["", "Creation methods:"]
+    lines += [f"  {method}: {val}" for method, val in report.get("creation_methods", {}).items()]
+    lines += [
+        "",
+        f"Issues found: {len(report.get('issues', []))}",
+        f"Overall report: {report.get('overall')}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def print_report(report):
+    sys.stdout.write(format_report(report))
+
+
+def main(argv):
+    if argv == ["--all"]:
+        from src.verify.sql_audit import iter_documents_status
+        document_ids = [d["document_id"] for d in iter_documents_status()]
+    else:
+        document_ids = argv or [DOCUMENT_ID]
+
+    # -----------------------------
+    # Load the reports (one process per core when there are several)
+    # -----------------------------
+    if len(document_ids) == 1:
+        reports = [_load_report(document_ids[0])]
+    else:
+        workers = min(len(document_ids), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            reports = executor.map(_load_report, document_ids)
+
+    for document_id, report in zip(document_ids, reports):
+        if len(document_ids) > 1:
+            sys.stdout.write(f"\n=== Document {document_id} ===\n")
+        print_report(report)
+
 
-print(f"\nIssues found: {len(report.get('issues', []))}")
-print(f"Overall report: {report.get('overall')}")
+if __name__ == "__main__":
+    main(sys.argv[1:])
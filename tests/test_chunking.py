@@ -16,3 +16,19 @@ def test_estimate_tokens():
     text = "hello world this is a test"
     tokens = estimate_tokens(text)
     assert tokens == 6
+
+
+def test_batch_token_counts_matches_single():
+    """Batched token counts agree with per-string counts."""
+    from src.ingest.chunking import estimate_tokens
+    from src.utils.tokenize import batch_token_counts
+    texts = ["hello world", "this is a test", ""]
+    assert batch_token_counts(texts) == [estimate_tokens(t) for t in texts]
+
+
+def test_split_points():
+    """Chunks close before the paragraph that would overflow max_tokens."""
+    import numpy as np
+    from src.ingest.chunking import _split_points
+    counts = np.array([3, 3, 3, 10, 1], dtype=np.int32)
+    assert _split_points(counts, 6).tolist() == [0, 2, 3, 4]
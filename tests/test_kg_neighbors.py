@@ -0,0 +1,62 @@
+"""Neighbor-query contract: APOC and fallback paths return the same shape.
+
+Needs a Neo4j server: set NEO4J_TEST_URI (and NEO4J_USER / NEO4J_PASSWORD).
+"""
+
+import os
+import uuid
+
+import pytest
+
+pytest.importorskip("neo4j")
+URI = os.getenv("NEO4J_TEST_URI")
+pytestmark = pytest.mark.skipif(not URI, reason="NEO4J_TEST_URI not set")
+
+
+def _normalize(result):
+    return (
+        sorted(n["entity_id"] for n in result["neighbors"]),
+        sorted((r["rel_id"], r["source"], r["target"]) for r in result["relationships"]),
+    )
+
+
+@pytest.fixture
+def graph():
+    from src.kg.neo4j_driver import Neo4jDriver
+
+    driver = Neo4jDriver(uri=URI)
+    doc_id = f"test-{uuid.uuid4()}"
+    a, b, c = (f"{doc_id}-{name}" for name in "abc")
+    driver.create_entities_bulk([
+        {"entity_id": eid, "text": eid, "type": "TEST", "doc_id": doc_id,
+         "chunk_id": "c", "page": 0, "confidence": 1.0, "metadata": {"chunk_ids": ["c"]}}
+        for eid in (a, b, c)
+    ])
+    driver.create_relationships_bulk([
+        {"rel_id": f"{doc_id}-ab", "source_id": a, "target_id": b, "rel_type": "KNOWS",
+         "rel_text": "", "confidence": 1.0, "doc_id": doc_id, "chunk_id": "c", "page": 0, "metadata": {"chunk_id": "c"}},
+        {"rel_id": f"{doc_id}-cb", "source_id": c, "target_id": a, "rel_type": "KNOWS",
+         "rel_text": "", "confidence": 1.0, "doc_id": doc_id, "chunk_id": "c", "page": 0, "metadata": {"chunk_id": "c"}},
+    ])
+    yield driver, a, b, c, doc_id
+    driver.clear_document_graph(doc_id)
+    driver.close()
+
+
+def test_fallback_relationships_carry_endpoint_ids(graph):
+    driver, a, b, c, doc_id = graph
+    driver._has_apoc = False
+    result = driver.query_neighbors(a)
+    assert _normalize(result) == (
+        sorted([b, c]),
+        sorted([(f"{doc_id}-ab", a, b), (f"{doc_id}-cb", c, a)]),
+    )
+
+
+def test_fallback_matches_apoc(graph):
+    driver, a, *_ = graph
+    apoc_result = driver.query_neighbors(a)
+    if not driver._has_apoc:
+        pytest.skip("APOC not installed")
+    driver._has_apoc = False
+    assert _normalize(driver.query_neighbors(a)) == _normalize(apoc_result)
@@ -0,0 +1,118 @@
+"""Query-count guards for the verify helpers.
+
+Each check must issue a fixed number of statements however many blocks,
+chunks or embeddings a document has. Needs PostgreSQL: set VERIFY_TEST_DSN
+to a scratch database (tables are created if missing).
+"""
+
+import contextlib
+import os
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+from sqlalchemy import create_engine, delete, event
+from sqlalchemy.orm import sessionmaker
+
+DSN = os.getenv("VERIFY_TEST_DSN")
+pytestmark = pytest.mark.skipif(not DSN, reason="VERIFY_TEST_DSN not set")
+
+
+@contextlib.contextmanager
+def count_queries(engine):
+    """Collect every statement sent to the database inside the block."""
+    statements = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    from src.db.models import Base, Block, Chunk, Document, Embedding
+    from src.verify import embedding_checks, sql_audit
+
+    engine = create_engine(DSN)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    monkeypatch.setattr(sql_audit, "get_session", Session)
+    monkeypatch.setattr(embedding_checks, "get_session", Session)
+    created = []
+
+    def make_document(n_blocks, **fields):
+        with Session() as session:
+            doc = Document(filename="n_plus_one.pdf", file_path="/tmp/n_plus_one.pdf", **fields)
+            session.add(doc)
+            session.flush()
+            for i in range(n_blocks):
+                block = Block(
+                    document_id=doc.document_id, page_number=i, block_type="text",
+                    content="text", extraction_method="test", confidence=90,
+                )
+                session.add(block)
+                session.flush()
+                chunk = Chunk(block_id=block.id, document_id=doc.document_id, page_number=i, chunk_text="text")
+                session.add(chunk)
+                session.flush()
+                session.add(Embedding(
+                    chunk_id=chunk.chunk_id, document_id=doc.document_id, vector_index=i,
+                    vector_dim=1, model_name="test", index_path="test.index",
+                ))
+            session.commit()
+            created.append(doc.document_id)
+            return doc.document_id
+
+    yield engine, make_document
+
+    with Session() as session:
+        for model in (Embedding, Chunk, Block, Document):
+            session.execute(delete(model).where(model.document_id.in_(created)))
+        session.commit()
+    engine.dispose()
+
+
+def _statement_counts(engine, make_document, check):
+    counts = []
+    for n_blocks in (1, 25):
+        document_id = make_document(n_blocks)
+        with count_queries(engine) as statements:
+            check(document_id)
+        counts.append(len(statements))
+    return counts
+
+
+def test_audit_document_query_count_is_constant(db):
+    from src.verify.sql_audit import audit_document
+    small, large = _statement_counts(*db, audit_document)
+    assert small == large
+
+
+def test_traceability_check_query_count_is_constant(db):
+    from src.verify.embedding_checks import traceability_check
+    small, large = _statement_counts(*db, traceability_check)
+    assert small == large == 2
+
+
+def test_list_documents_status_is_one_query_per_page(db):
+    from src.verify.sql_audit import list_documents_status
+    engine, make_document = db
+    for _ in range(3):
+        make_document(2)
+    with count_queries(engine) as statements:
+        rows = list(list_documents_status(page_size=2))
+    assert len(rows) == 2
+    assert len(statements) == 1
+
+
+def test_iter_documents_status_pages_past_null_created_at(db):
+    from src.verify.sql_audit import iter_documents_status
+    _, make_document = db
+    undated = {str(make_document(0, created_at=None)) for _ in range(3)}
+    seen = {row["document_id"] for row in iter_documents_status(page_size=1)}
+    assert undated <= seen